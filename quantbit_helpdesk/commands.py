@@ -0,0 +1,119 @@
+import click
+from frappe.commands import pass_context
+
+
+@click.command("rebuild-ticket-counters")
+@pass_context
+def rebuild_ticket_counters(context):
+	"Recount the Ticket Counter table from HD Ticket"
+	import frappe
+
+	from quantbit_helpdesk.mobile_env.ticket_counters import rebuild_ticket_counters as rebuild
+
+	for site in context.sites:
+		frappe.init(site=site)
+		frappe.connect()
+		try:
+			rebuild()
+			frappe.db.commit()
+		finally:
+			frappe.destroy()
+
+
+@click.command("rebuild-sla-risk-queue")
+@pass_context
+def rebuild_sla_risk_queue(context):
+	"Rebuild the SLA Risk Entry table from HD Ticket (repair; the hourly job keeps it current)"
+	import frappe
+
+	from quantbit_helpdesk.mobile_env.sla_risk import rebuild_sla_risk_queue as rebuild
+
+	for site in context.sites:
+		frappe.init(site=site)
+		frappe.connect()
+		try:
+			rebuild()
+			frappe.db.commit()
+		finally:
+			frappe.destroy()
+
+
+@click.command("rebuild-helpdesk-rollup")
+@click.option("--from-date", help="First date to rebuild (default: first ticket)")
+@click.option("--to-date", help="Last date to rebuild (default: today)")
+@click.option("--workers", type=int, default=4, help="Parallel worker processes")
+@pass_context
+def rebuild_helpdesk_rollup(context, from_date=None, to_date=None, workers=4):
+	"Recompute Helpdesk Daily Rollup rows, one date range per worker process"
+	import multiprocessing
+	from concurrent.futures import ProcessPoolExecutor
+
+	import frappe
+	from frappe.utils import getdate, today
+
+	from quantbit_helpdesk.mobile_env.analytics import (
+		date_ranges,
+		first_ticket_date,
+		rebuild_rollup_range_for_site,
+	)
+
+	for site in context.sites:
+		frappe.init(site=site)
+		frappe.connect()
+		try:
+			start = from_date or first_ticket_date()
+			end = to_date or today()
+		finally:
+			frappe.destroy()
+		if not start:
+			continue
+
+		# spawn, not fork: every worker opens its own database connection
+		with ProcessPoolExecutor(
+			max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+		) as executor:
+			futures = [
+				executor.submit(rebuild_rollup_range_for_site, site, range_start, range_end)
+				for range_start, range_end in date_ranges(getdate(start), getdate(end))
+			]
+			for future in futures:
+				future.result()
+		click.echo(f"{site}: rebuilt helpdesk rollup from {getdate(start)} to {getdate(end)}")
+
+
+@click.command("import-tickets")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+	"--format",
+	"file_format",
+	type=click.Choice(["csv", "ndjson", "xlsx"]),
+	help="Defaults to the file extension",
+)
+@click.option(
+	"--skip-invalid", is_flag=True, default=False, help="Insert the valid rows even if some rows fail"
+)
+@pass_context
+def import_tickets(context, path, file_format=None, skip_invalid=False):
+	"Bulk import HD Tickets from a CSV, NDJSON or XLSX file"
+	import os
+
+	import frappe
+
+	from quantbit_helpdesk.mobile_env.ticket_import import import_tickets as run_import
+
+	path = os.path.abspath(path)
+	for site in context.sites:
+		frappe.init(site=site)
+		frappe.connect()
+		try:
+			frappe.set_user("Administrator")
+			result = run_import(path, file_format, skip_invalid)
+		finally:
+			frappe.destroy()
+
+		for error in result["errors"]:
+			click.echo(f"row {error['row']}: {'; '.join(error['errors'])}", err=True)
+		click.echo(f"{site}: {result['inserted']} tickets imported, {result['error_count']} rows with errors")
+
+
+commands = [rebuild_ticket_counters, rebuild_sla_risk_queue, rebuild_helpdesk_rollup, import_tickets]
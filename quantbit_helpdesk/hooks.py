@@ -145,6 +145,149 @@ app_license = "mit"
 # 	}
 # }
 
+doc_events = {
+	"HD Ticket": {
+		"validate": [
+			"quantbit_helpdesk.mobile_env.helpdesk.set_ticket_preview",
+			"quantbit_helpdesk.mobile_env.ticket_counters.snapshot_ticket_counters",
+		],
+		"on_change": [
+			"quantbit_helpdesk.mobile_env.ticket_search.index_ticket",
+			"quantbit_helpdesk.mobile_env.ticket_counters.update_ticket_counters",
+			"quantbit_helpdesk.mobile_env.sla_risk.sync_sla_risk_entries",
+			"quantbit_helpdesk.mobile_env.assignment.on_ticket_status_change",
+			"quantbit_helpdesk.mobile_env.duplicates.index_ticket_fingerprint",
+			"quantbit_helpdesk.mobile_env.similar_tickets.queue_similar_ticket_index",
+			"quantbit_helpdesk.mobile_env.realtime.publish_ticket_change",
+		],
+		"on_trash": [
+			"quantbit_helpdesk.mobile_env.ticket_search.remove_ticket",
+			"quantbit_helpdesk.mobile_env.ticket_counters.remove_ticket_counters",
+			"quantbit_helpdesk.mobile_env.sla_risk.remove_sla_risk_entries",
+			"quantbit_helpdesk.mobile_env.duplicates.remove_ticket_fingerprint",
+			"quantbit_helpdesk.mobile_env.similar_tickets.remove_from_similar_ticket_index",
+			"quantbit_helpdesk.mobile_env.realtime.publish_ticket_delete",
+		],
+	},
+	"Communication": {
+		"after_insert": "quantbit_helpdesk.mobile_env.realtime.publish_communication",
+		"on_change": "quantbit_helpdesk.mobile_env.ticket_search.index_communication",
+		"on_trash": "quantbit_helpdesk.mobile_env.ticket_search.remove_communication",
+	},
+	"Quantbit Department": {
+		"on_update": "quantbit_helpdesk.mobile_env.helpdesk.clear_helpdesk_masters_cache",
+		"on_trash": "quantbit_helpdesk.mobile_env.helpdesk.clear_helpdesk_masters_cache",
+		"after_rename": "quantbit_helpdesk.mobile_env.helpdesk.clear_helpdesk_masters_cache",
+	},
+	"SubDepartment": {
+		"on_update": "quantbit_helpdesk.mobile_env.helpdesk.clear_helpdesk_masters_cache",
+		"on_trash": "quantbit_helpdesk.mobile_env.helpdesk.clear_helpdesk_masters_cache",
+		"after_rename": "quantbit_helpdesk.mobile_env.helpdesk.clear_helpdesk_masters_cache",
+	},
+	"HD Team": {
+		"on_update": [
+			"quantbit_helpdesk.mobile_env.helpdesk.clear_helpdesk_masters_cache",
+			"quantbit_helpdesk.mobile_env.assignment.clear_team_loads",
+			"quantbit_helpdesk.mobile_env.realtime.clear_team_members",
+		],
+		"on_trash": [
+			"quantbit_helpdesk.mobile_env.helpdesk.clear_helpdesk_masters_cache",
+			"quantbit_helpdesk.mobile_env.assignment.clear_team_loads",
+			"quantbit_helpdesk.mobile_env.realtime.clear_team_members",
+		],
+		"after_rename": [
+			"quantbit_helpdesk.mobile_env.helpdesk.clear_helpdesk_masters_cache",
+			"quantbit_helpdesk.mobile_env.assignment.clear_team_loads",
+			"quantbit_helpdesk.mobile_env.realtime.clear_team_members",
+		],
+	},
+	"HD Agent": {
+		"on_update": [
+			"quantbit_helpdesk.mobile_env.assignment.clear_team_loads",
+			"quantbit_helpdesk.mobile_env.realtime.clear_team_members",
+		],
+		"on_trash": [
+			"quantbit_helpdesk.mobile_env.assignment.clear_team_loads",
+			"quantbit_helpdesk.mobile_env.realtime.clear_team_members",
+		],
+	},
+	"ToDo": {
+		"after_insert": [
+			"quantbit_helpdesk.mobile_env.assignment.on_todo_insert",
+			"quantbit_helpdesk.mobile_env.realtime.publish_assignment",
+		],
+		"on_update": [
+			"quantbit_helpdesk.mobile_env.assignment.on_todo_update",
+			"quantbit_helpdesk.mobile_env.realtime.publish_assignment",
+		],
+		"on_trash": "quantbit_helpdesk.mobile_env.assignment.on_todo_trash",
+	},
+	"Environment": {
+		"on_update": "quantbit_helpdesk.mobile_env.helpdesk.clear_helpdesk_masters_cache",
+		"on_trash": "quantbit_helpdesk.mobile_env.helpdesk.clear_helpdesk_masters_cache",
+		"after_rename": "quantbit_helpdesk.mobile_env.helpdesk.clear_helpdesk_masters_cache",
+	},
+	"Module": {
+		"on_update": "quantbit_helpdesk.mobile_env.helpdesk.clear_helpdesk_masters_cache",
+		"on_trash": "quantbit_helpdesk.mobile_env.helpdesk.clear_helpdesk_masters_cache",
+		"after_rename": "quantbit_helpdesk.mobile_env.helpdesk.clear_helpdesk_masters_cache",
+	},
+	"SubModule": {
+		"on_update": "quantbit_helpdesk.mobile_env.helpdesk.clear_helpdesk_masters_cache",
+		"on_trash": "quantbit_helpdesk.mobile_env.helpdesk.clear_helpdesk_masters_cache",
+		"after_rename": "quantbit_helpdesk.mobile_env.helpdesk.clear_helpdesk_masters_cache",
+	},
+	"Development State": {
+		"on_update": "quantbit_helpdesk.mobile_env.helpdesk.clear_helpdesk_masters_cache",
+		"on_trash": "quantbit_helpdesk.mobile_env.helpdesk.clear_helpdesk_masters_cache",
+		"after_rename": "quantbit_helpdesk.mobile_env.helpdesk.clear_helpdesk_masters_cache",
+	},
+	"HD Ticket Type": {
+		"on_update": "quantbit_helpdesk.mobile_env.helpdesk.clear_helpdesk_masters_cache",
+		"on_trash": "quantbit_helpdesk.mobile_env.helpdesk.clear_helpdesk_masters_cache",
+		"after_rename": "quantbit_helpdesk.mobile_env.helpdesk.clear_helpdesk_masters_cache",
+	},
+	"HD Ticket Priority": {
+		"on_update": "quantbit_helpdesk.mobile_env.helpdesk.clear_helpdesk_masters_cache",
+		"on_trash": "quantbit_helpdesk.mobile_env.helpdesk.clear_helpdesk_masters_cache",
+		"after_rename": "quantbit_helpdesk.mobile_env.helpdesk.clear_helpdesk_masters_cache",
+	},
+	"Contact": {
+		"on_update": "quantbit_helpdesk.mobile_env.helpdesk.clear_helpdesk_masters_cache",
+		"on_trash": "quantbit_helpdesk.mobile_env.helpdesk.clear_helpdesk_masters_cache",
+		"after_rename": "quantbit_helpdesk.mobile_env.helpdesk.clear_helpdesk_masters_cache",
+	},
+	"HD Customer": {
+		"on_update": "quantbit_helpdesk.mobile_env.helpdesk.clear_helpdesk_masters_cache",
+		"on_trash": "quantbit_helpdesk.mobile_env.helpdesk.clear_helpdesk_masters_cache",
+		"after_rename": "quantbit_helpdesk.mobile_env.helpdesk.clear_helpdesk_masters_cache",
+	},
+	"HD Service Level Agreement": {
+		"on_update": "quantbit_helpdesk.mobile_env.helpdesk.clear_helpdesk_masters_cache",
+		"on_trash": "quantbit_helpdesk.mobile_env.helpdesk.clear_helpdesk_masters_cache",
+		"after_rename": "quantbit_helpdesk.mobile_env.helpdesk.clear_helpdesk_masters_cache",
+	},
+	"Email Account": {
+		"on_update": "quantbit_helpdesk.mobile_env.helpdesk.clear_helpdesk_masters_cache",
+		"on_trash": "quantbit_helpdesk.mobile_env.helpdesk.clear_helpdesk_masters_cache",
+		"after_rename": "quantbit_helpdesk.mobile_env.helpdesk.clear_helpdesk_masters_cache",
+	},
+	"HD Ticket Feedback Option": {
+		"on_update": "quantbit_helpdesk.mobile_env.helpdesk.clear_helpdesk_masters_cache",
+		"on_trash": "quantbit_helpdesk.mobile_env.helpdesk.clear_helpdesk_masters_cache",
+		"after_rename": "quantbit_helpdesk.mobile_env.helpdesk.clear_helpdesk_masters_cache",
+	},
+	"File": {
+		"after_insert": "quantbit_helpdesk.mobile_env.thumbnails.queue_thumbnails",
+		"on_trash": "quantbit_helpdesk.mobile_env.thumbnails.remove_thumbnails",
+	},
+	"User": {
+		"on_update": "quantbit_helpdesk.mobile_env.user_profile.clear_user_profile",
+		"on_trash": "quantbit_helpdesk.mobile_env.user_profile.clear_user_profile",
+		"after_rename": "quantbit_helpdesk.mobile_env.user_profile.clear_user_profile",
+	},
+}
+
 # Scheduled Tasks
 # ---------------
 
@@ -166,6 +309,24 @@ app_license = "mit"
 # 	],
 # }
 
+scheduler_events = {
+	"hourly": [
+		"quantbit_helpdesk.mobile_env.sla_risk.refresh_sla_risk_entries",
+		"quantbit_helpdesk.mobile_env.assignment.clear_team_loads",
+	],
+	"daily": [
+		"quantbit_helpdesk.mobile_env.uploads.remove_stale_uploads",
+		"quantbit_helpdesk.mobile_env.mutations.remove_old_mutations",
+	],
+	"daily_long": [
+		"quantbit_helpdesk.mobile_env.analytics.update_helpdesk_rollup",
+		"quantbit_helpdesk.mobile_env.archive.archive_closed_tickets",
+	],
+	"weekly": [
+		"quantbit_helpdesk.mobile_env.similar_tickets.rebuild_similar_ticket_indexes",
+	],
+}
+
 # Testing
 # -------
 
@@ -198,6 +359,7 @@ app_license = "mit"
 # ----------------
 # before_request = ["quantbit_helpdesk.utils.before_request"]
 # after_request = ["quantbit_helpdesk.utils.after_request"]
+after_request = ["quantbit_helpdesk.mobile_env.http.after_request"]
 
 # Job Events
 # ----------
@@ -0,0 +1,263 @@
+import hashlib
+import json
+
+import frappe
+from frappe.utils import add_days, cstr, flt, getdate, now, today
+
+# Daily helpdesk metrics, pre-aggregated into `Helpdesk Daily Rollup` rows
+# keyed by (date, department, module, team, priority). A date's rows are
+# always recomputed as a whole from HD Ticket, Archived Ticket and Version,
+# so re-running a date is idempotent; the nightly job only recomputes the
+# dates touched by tickets, versions or deletions since the last run.
+DIMENSIONS = {
+    "department": "custom_department",
+    "module": "custom_module",
+    "team": "agent_group",
+    "priority": "priority",
+}
+METRICS = (
+    "opened_count",
+    "resolved_count",
+    "reopened_count",
+    "first_response_count",
+    "first_response_seconds",
+    "resolution_seconds",
+)
+RESOLVED_STATUSES = ("Resolved", "Closed")
+WATERMARK_KEY = "quantbit_helpdesk_rollup_watermark"
+REBUILD_CHUNK_DAYS = 31
+
+_DIMENSION_COLUMNS = ", ".join(DIMENSIONS.values())
+# archived tickets keep the columns the metrics need (see
+# archive.ARCHIVED_METRIC_FIELDS); exposed under the HD Ticket names
+TICKET_SOURCES = (
+    "`tabHD Ticket`",
+    f"""(
+        select opened_on as creation, first_responded_on, resolution_date, {_DIMENSION_COLUMNS}
+        from `tabArchived Ticket`
+    ) archived""",
+)
+
+
+def _rollup_name(key):
+    return hashlib.md5("|".join(cstr(v) for v in key).encode(), usedforsecurity=False).hexdigest()
+
+
+def _ticket_metrics(dates, date_column, select):
+    """
+    Rows of (day, *dimensions, *select) for live and archived tickets whose
+    `date_column` falls on `dates`; a key can appear once per source.
+    """
+    rows = []
+    for source in TICKET_SOURCES:
+        rows.extend(
+            frappe.db.sql(
+                f"""
+                select date({date_column}) as day, {_DIMENSION_COLUMNS}, {select}
+                from {source}
+                where {date_column} >= %(start)s and {date_column} < %(end)s
+                    and date({date_column}) in %(dates)s
+                group by day, {_DIMENSION_COLUMNS}
+                """,
+                {"start": min(dates), "end": add_days(max(dates), 1), "dates": dates},
+            )
+        )
+    return rows
+
+
+def _reopen_counts(dates):
+    """{(day, *dimensions): count} of Resolved/Closed -> open status changes."""
+    versions = frappe.db.sql(
+        """
+        select docname, date(creation) as day, data
+        from `tabVersion`
+        where ref_doctype = 'HD Ticket' and creation >= %(start)s and creation < %(end)s
+            and date(creation) in %(dates)s and data like '%%"status"%%'
+        """,
+        {"start": min(dates), "end": add_days(max(dates), 1), "dates": dates},
+        as_dict=True,
+    )
+    reopens = []
+    for version in versions:
+        for change in json.loads(version.data).get("changed") or []:
+            if change[0] == "status" and change[1] in RESOLVED_STATUSES and change[2] not in RESOLVED_STATUSES:
+                reopens.append(version)
+    if not reopens:
+        return {}
+
+    names = list({v.docname for v in reopens})
+    dimensions = {}
+    for doctype in ("HD Ticket", "Archived Ticket"):
+        for t in frappe.get_all(
+            doctype, filters={"name": ["in", names]}, fields=["name", *DIMENSIONS.values()]
+        ):
+            dimensions[str(t.name)] = tuple(t[column] for column in DIMENSIONS.values())
+    counts = {}
+    for version in reopens:
+        if version.docname in dimensions:
+            key = (version.day, *dimensions[version.docname])
+            counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+def rollup_dates(dates):
+    """Recompute every rollup row of `dates`."""
+    dates = sorted({getdate(d) for d in dates})
+    if not dates:
+        return
+
+    rows = {}
+
+    def bucket(key):
+        return rows.setdefault(tuple(key), dict.fromkeys(METRICS, 0))
+
+    for *key, count in _ticket_metrics(dates, "creation", "count(*)"):
+        bucket(key)["opened_count"] += count
+    for *key, count, seconds in _ticket_metrics(
+        dates, "first_responded_on", "count(*), sum(timestampdiff(second, creation, first_responded_on))"
+    ):
+        metrics = bucket(key)
+        metrics["first_response_count"] += count
+        metrics["first_response_seconds"] += flt(seconds)
+    for *key, count, seconds in _ticket_metrics(
+        dates, "resolution_date", "count(*), sum(timestampdiff(second, creation, resolution_date))"
+    ):
+        metrics = bucket(key)
+        metrics["resolved_count"] += count
+        metrics["resolution_seconds"] += flt(seconds)
+    for key, count in _reopen_counts(dates).items():
+        bucket(key)["reopened_count"] = count
+
+    frappe.db.delete("Helpdesk Daily Rollup", {"date": ["in", dates]})
+    timestamp = now()
+    frappe.db.bulk_insert(
+        "Helpdesk Daily Rollup",
+        ["name", "creation", "modified", "owner", "modified_by", "date", *DIMENSIONS, *METRICS],
+        [
+            (
+                _rollup_name(key), timestamp, timestamp, "Administrator", "Administrator",
+                *key, *(metrics[m] for m in METRICS),
+            )
+            for key, metrics in rows.items()
+        ],
+    )
+
+
+def _changed_dates(since):
+    """Dates whose rollup may differ because of changes after `since`."""
+    dates = set()
+    for row in frappe.db.sql(
+        """
+        select date(creation), date(first_responded_on), date(resolution_date)
+        from `tabHD Ticket` where modified > %s
+        """,
+        since,
+    ):
+        dates.update(d for d in row if d)
+
+    dates.update(
+        frappe.db.sql_list(
+            """
+            select distinct date(creation) from `tabVersion`
+            where ref_doctype = 'HD Ticket' and creation > %s
+            """,
+            since,
+        )
+    )
+
+    for data in frappe.get_all(
+        "Deleted Document",
+        filters={"deleted_doctype": "HD Ticket", "creation": [">", since]},
+        pluck="data",
+    ):
+        ticket = json.loads(data)
+        for field in ("creation", "first_responded_on", "resolution_date"):
+            if ticket.get(field):
+                dates.add(getdate(ticket[field]))
+    return dates
+
+
+def first_ticket_date():
+    """Creation of the oldest live or archived ticket, None when there are none."""
+    dates = [
+        frappe.db.sql("select min(creation) from `tabHD Ticket`")[0][0],
+        frappe.db.sql("select min(opened_on) from `tabArchived Ticket`")[0][0],
+    ]
+    return min((d for d in dates if d), default=None)
+
+
+def update_helpdesk_rollup():
+    """Nightly: recompute the dates changed since the previous run."""
+    started = now()
+    since = frappe.db.get_global(WATERMARK_KEY)
+    if since:
+        rollup_dates(_changed_dates(since))
+    else:
+        first = first_ticket_date()
+        if first:
+            rebuild_rollup_range(getdate(first), getdate(today()))
+    frappe.db.set_global(WATERMARK_KEY, started)
+
+
+def date_ranges(from_date, to_date, days=REBUILD_CHUNK_DAYS):
+    """Split [from_date, to_date] into consecutive ranges of at most `days`."""
+    start, end = getdate(from_date), getdate(to_date)
+    while start <= end:
+        chunk_end = min(add_days(start, days - 1), end)
+        yield start, chunk_end
+        start = add_days(chunk_end, 1)
+
+
+def rebuild_rollup_range(from_date, to_date):
+    for start, end in date_ranges(from_date, to_date):
+        dates = [add_days(start, i) for i in range((end - start).days + 1)]
+        rollup_dates(dates)
+        frappe.db.commit()
+
+
+def rebuild_rollup_range_for_site(site, from_date, to_date):
+    """Process pool entry point for `bench rebuild-helpdesk-rollup`."""
+    frappe.init(site=site)
+    frappe.connect()
+    try:
+        rebuild_rollup_range(from_date, to_date)
+    finally:
+        frappe.destroy()
+
+
+@frappe.whitelist()
+def get_helpdesk_metrics(from_date, to_date, group_by="date", department=None, module=None, team=None, priority=None):
+    """
+    Ticket metrics between two dates from the rollup table, grouped by
+    date or one of department / module / team / priority.
+    """
+    try:
+        if group_by != "date" and group_by not in DIMENSIONS:
+            return {"status": "error", "code": 400, "message": f"Cannot group by {group_by}."}
+
+        filters = {"date": ["between", [getdate(from_date), getdate(to_date)]]}
+        for dimension, value in (("department", department), ("module", module), ("team", team), ("priority", priority)):
+            if value:
+                filters[dimension] = value
+
+        rows = frappe.get_all(
+            "Helpdesk Daily Rollup",
+            filters=filters,
+            fields=[group_by, *(f"sum({metric}) as {metric}" for metric in METRICS)],
+            group_by=group_by,
+            order_by=f"{group_by} asc",
+        )
+        for row in rows:
+            for metric in METRICS:
+                row[metric] = flt(row[metric])
+            row["avg_first_response_seconds"] = (
+                row.first_response_seconds / row.first_response_count if row.first_response_count else None
+            )
+            row["avg_resolution_seconds"] = (
+                row.resolution_seconds / row.resolved_count if row.resolved_count else None
+            )
+        return {"status": "success", "code": 200, "data": rows}
+
+    except Exception as e:
+        frappe.log_error(frappe.get_traceback(), "Error in get_helpdesk_metrics")
+        return {"status": "error", "code": 500, "message": str(e)}
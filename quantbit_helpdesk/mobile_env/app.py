@@ -36,6 +36,7 @@ from mobile.mobile_env.app_utils import (
     get_global_defaults,
     exception_handel,
 )
+from quantbit_helpdesk.mobile_env.thumbnails import get_absolute_thumbnail_url
 
 from erpnext.accounts.utils import get_fiscal_year
 
@@ -94,14 +95,14 @@ def add_comment(reference_doctype=None, reference_name=None, content=None):
             "User", frappe.session.user, "full_name", as_dict=1
         )
 
-        add_comment(
+        comment = add_comment(
             reference_doctype=reference_doctype,
             reference_name=reference_name,
             content=content,
             comment_email=frappe.session.user,
             comment_by=comment_by.get("full_name"),
         )
-        return gen_response(200, "Comment Added Successfully")
+        return gen_response(200, "Comment Added Successfully", {"name": comment.name})
 
     except Exception as e:
         return exception_handel(e)
@@ -137,10 +138,7 @@ def get_comments(reference_doctype=None, reference_name=None):
             )
             
        
-            if user_image is not None:
-                comment["user_image"] = frappe.utils.get_url()+ user_image
-            else:
-                comment["user_image"] = None
+            comment["user_image"] = get_absolute_thumbnail_url(user_image)
             comment["commented"] = pretty_date(comment["creation"])
             comment["creation"] = comment["creation"].strftime('%Y-%m-%d %H:%M %p')
 
@@ -179,10 +177,7 @@ def get_dashboard():
             "Employee", emp_data.get("name"), "image"
         )
        
-        if str1 is not None:
-            dashboard_data["employee_image"] = frappe.utils.get_url() + str1
-        else:
-            dashboard_data["employee_image"] = None
+        dashboard_data["employee_image"] = get_absolute_thumbnail_url(str1)
             
         get_last_log_type(dashboard_data, emp_data.get("name"))
         return gen_response(200, "Dashboard data get successfully", dashboard_data)
@@ -206,10 +201,7 @@ def get_emp_name():
             "User",frappe.session.user, "user_image",
         )
       
-        if str1 is not None:
-            dashboard_data["employee_image"] = frappe.utils.get_url()+ str1
-        else:
-            dashboard_data["employee_image"] = None
+        dashboard_data["employee_image"] = get_absolute_thumbnail_url(str1)
         return gen_response(200, "Dashboard data get successfully", dashboard_data)
 
     except Exception as e:
@@ -276,10 +268,7 @@ def get_profile():
         image=frappe.get_cached_value(
             "Employee", emp_data.get("name"), "image"
         )
-        if image is not None:
-            employee_details["employee_image"] = frappe.utils.get_url()+ image
-        else:
-            employee_details["employee_image"] = None
+        employee_details["employee_image"] = get_absolute_thumbnail_url(image, "medium")
         
 
         return gen_response(200, "My Profile", employee_details)
@@ -388,10 +377,7 @@ def get_data_from_notes(doc_name):
                 "User", i.added_by, "user_image", cache=True
             )
         frappe.msgprint(str1)
-        if str1 is not None:
-            note_dict['image'] = frappe.utils.get_url()+ str1
-        else:
-            note_dict['image'] = None
+        note_dict['image'] = get_absolute_thumbnail_url(str1)
         
         note_li.append(note_dict)
 
@@ -416,7 +402,7 @@ def create_employee_log(log_type, location=None):
             )
         ).insert(ignore_permissions=True)
         update_shift_last_sync(emp_data)
-        return gen_response(200, "Employee Log Added")
+        return gen_response(200, "Employee Log Added", {"name": log_doc.name})
     except Exception as e:
         return exception_handel(e)
 
@@ -1,5 +1,7 @@
+import html
+import re
+
 import frappe
-from bs4 import BeautifulSoup
 from frappe import _
 from frappe.utils import cstr
 
@@ -8,12 +10,22 @@ from frappe.utils import cstr
 def gen_response(status, message, data=[]):
     frappe.response["http_status_code"] = status
     if status == 500:
-        frappe.response["message"] = BeautifulSoup(str(message)).get_text()
+        frappe.response["message"] = html_to_text(message)
     else:
         frappe.response["message"] = message
     frappe.response["data"] = data
 
 
+def html_to_text(content, limit=None):
+    """Plain text from an HTML field without building a DOM, optionally truncated."""
+    # tags become spaces so "<p>a</p><p>b</p>" does not collapse into "ab"
+    text = html.unescape(re.sub(r"<[^>]*>", " ", cstr(content)))
+    text = re.sub(r"\s+", " ", text).strip()
+    if limit and len(text) > limit:
+        text = text[: limit - 1].rstrip() + "…"
+    return text
+
+
 def exception_handel(e):
     frappe.log_error(title="Mobile App Error", message=frappe.get_traceback())
     if hasattr(e, "http_status_code"):
@@ -0,0 +1,183 @@
+import base64
+import json
+import zlib
+
+import frappe
+from frappe.utils import add_days, cint, now, nowdate
+
+from quantbit_helpdesk.mobile_env import duplicates, sla_risk, ticket_counters, ticket_search
+from quantbit_helpdesk.mobile_env.similar_tickets import remove_tickets_from_similar_ticket_indexes
+
+# Hot/cold split for HD Ticket: tickets closed for longer than
+# `helpdesk_archive_after_days` (site config, default 365) are packed with
+# their child rows, communications and comments into one compressed
+# `Archived Ticket` row and removed from the hot tables with plain deletes.
+# File records are left alone so attachment URLs keep working; the sidecar
+# tables are cleaned up explicitly because no document events fire. Read
+# endpoints in helpdesk.py fall back to get_archived_ticket, and
+# changes_since reports archived tickets as tombstones.
+ARCHIVE_AFTER_DAYS = 365
+ARCHIVE_BATCH_SIZE = 200
+ARCHIVED_STATUSES = ("Closed",)
+TICKET_COMMENT_DOCTYPE = "HD Ticket Comment"
+# copied out of the payload so the daily rollup can keep counting archived
+# tickets (see analytics._ticket_metrics)
+ARCHIVED_METRIC_FIELDS = (
+    "opened_on", "first_responded_on", "resolution_date",
+    "agent_group", "custom_department", "custom_module", "priority",
+)
+
+
+def _archive_after_days():
+    return cint(frappe.conf.get("helpdesk_archive_after_days")) or ARCHIVE_AFTER_DAYS
+
+
+def _pack(payload):
+    return base64.b64encode(zlib.compress(json.dumps(payload, default=str).encode(), 9)).decode()
+
+
+def _unpack(data):
+    return json.loads(zlib.decompress(base64.b64decode(data)))
+
+
+def archived_ticket_metrics(ticket):
+    """Values of ARCHIVED_METRIC_FIELDS for an HD Ticket row."""
+    return (
+        ticket.creation, ticket.first_responded_on, ticket.resolution_date, ticket.agent_group,
+        ticket.get("custom_department"), ticket.get("custom_module"), ticket.priority,
+    )
+
+
+def _group_by(rows, field):
+    grouped = {}
+    for row in rows:
+        grouped.setdefault(str(row[field]), []).append(row)
+    return grouped
+
+
+def archive_tickets(names):
+    """Move the given tickets to the archive. The caller commits."""
+    tickets = frappe.db.sql(
+        "select * from `tabHD Ticket` where name in %(names)s", {"names": names}, as_dict=True
+    )
+    if not tickets:
+        return 0
+    names = [t.name for t in tickets]
+
+    children = {}
+    for df in frappe.get_meta("HD Ticket").get_table_fields():
+        rows = frappe.db.sql(
+            f"""select * from `tab{df.options}`
+            where parenttype = 'HD Ticket' and parentfield = %(field)s and parent in %(names)s
+            order by idx""",
+            {"field": df.fieldname, "names": names},
+            as_dict=True,
+        )
+        children[df.fieldname] = (df.options, _group_by(rows, "parent"))
+
+    communications = frappe.db.sql(
+        """select * from `tabCommunication`
+        where reference_doctype = 'HD Ticket' and reference_name in %(names)s
+        order by creation, name""",
+        {"names": names},
+        as_dict=True,
+    )
+    communication_names = [c.name for c in communications]
+    links = []
+    if communication_names:
+        links = frappe.db.sql(
+            "select * from `tabCommunication Link` where parent in %(names)s",
+            {"names": communication_names},
+            as_dict=True,
+        )
+
+    comments = []
+    has_comments = frappe.db.table_exists(TICKET_COMMENT_DOCTYPE)
+    if has_comments:
+        comments = frappe.db.sql(
+            f"""select * from `tab{TICKET_COMMENT_DOCTYPE}`
+            where reference_ticket in %(names)s order by creation""",
+            {"names": names},
+            as_dict=True,
+        )
+
+    communications_by_ticket = _group_by(communications, "reference_name")
+    links_by_communication = _group_by(links, "parent")
+    comments_by_ticket = _group_by(comments, "reference_ticket") if comments else {}
+
+    timestamp, user = now(), frappe.session.user
+    rows = []
+    for ticket in tickets:
+        name = str(ticket.name)
+        thread = communications_by_ticket.get(name, [])
+        payload = {
+            "ticket": ticket,
+            "children": {field: grouped.get(name, []) for field, (_, grouped) in children.items()},
+            "communications": thread,
+            "communication_links": [link for c in thread for link in links_by_communication.get(c.name, [])],
+            "comments": comments_by_ticket.get(name, []),
+        }
+        rows.append(
+            (
+                name, timestamp, timestamp, user, user, name, ticket.subject, ticket.status,
+                ticket.resolution_date or ticket.modified, *archived_ticket_metrics(ticket),
+                len(thread), _pack(payload),
+            )
+        )
+    frappe.db.bulk_insert(
+        "Archived Ticket",
+        [
+            "name", "creation", "modified", "owner", "modified_by", "ticket", "subject", "status",
+            "closed_on", *ARCHIVED_METRIC_FIELDS, "communication_count", "data",
+        ],
+        rows,
+    )
+
+    for ticket in tickets:
+        ticket_search.remove_ticket(ticket)
+        ticket_counters.remove_ticket_counters(ticket)
+        sla_risk.remove_sla_risk_entries(ticket)
+        duplicates.remove_ticket_fingerprint(ticket)
+    remove_tickets_from_similar_ticket_indexes(tickets)
+
+    for doctype, _ in children.values():
+        frappe.db.delete(doctype, {"parenttype": "HD Ticket", "parent": ["in", names]})
+    if communication_names:
+        frappe.db.delete("Communication Link", {"parent": ["in", communication_names]})
+        frappe.db.delete("Communication", {"name": ["in", communication_names]})
+    if has_comments:
+        frappe.db.delete(TICKET_COMMENT_DOCTYPE, {"reference_ticket": ["in", names]})
+    frappe.db.delete("HD Ticket", {"name": ["in", names]})
+    return len(tickets)
+
+
+def archive_closed_tickets():
+    """Daily: archive tickets closed before the configured cutoff, a batch per commit."""
+    cutoff = add_days(nowdate(), -_archive_after_days())
+    while True:
+        names = frappe.db.sql_list(
+            """
+            select name from `tabHD Ticket`
+            where status in %(statuses)s and coalesce(resolution_date, modified) < %(cutoff)s
+            order by name
+            limit %(limit)s
+            """,
+            {"statuses": ARCHIVED_STATUSES, "cutoff": cutoff, "limit": ARCHIVE_BATCH_SIZE},
+        )
+        if not names:
+            break
+        archive_tickets(names)
+        frappe.db.commit()
+
+
+def get_archived_ticket(name):
+    """The unpacked archive payload of `name`, or None if it was never archived."""
+    data = frappe.db.get_value("Archived Ticket", str(name), "data")
+    if not data:
+        return None
+    archived = frappe._dict(_unpack(data))
+    # checked against the archived row, so user permissions, if_owner and the
+    # HD Ticket has_permission hooks apply as they did to the live ticket
+    ticket = frappe.get_doc({**archived.ticket, "doctype": "HD Ticket"})
+    frappe.has_permission("HD Ticket", "read", doc=ticket, throw=True)
+    return archived
@@ -0,0 +1,193 @@
+import json
+
+import frappe
+
+# Least-loaded auto-assignment.
+#
+# Every HD Team has a Redis sorted set of its active agents scored by their
+# load: the number of open ToDo assignments on tickets that are not resolved
+# or closed. Picking an agent pops the lowest score and increments it in one
+# Lua call, so concurrent creates on different gunicorn workers never hand
+# the same slot out twice. Loads are adjusted from ToDo and HD Ticket events;
+# the sets are dropped hourly (and on team changes) and re-seeded lazily from
+# the database, which bounds any drift. Seeding happens inside the pick
+# script and only when the set is missing, so a worker that seeds late never
+# overwrites picks already counted by another.
+TEAM_LOAD_KEY = "quantbit_helpdesk:agent_load:"
+AGENT_TEAMS_KEY = "quantbit_helpdesk:agent_teams"
+INACTIVE_TICKET_STATUSES = ("Resolved", "Closed")
+
+# ARGV: optional score, member pairs to seed a missing set with
+PICK_LEAST_LOADED = """
+if #ARGV > 0 and redis.call('EXISTS', KEYS[1]) == 0 then
+    for i = 1, #ARGV, 2 do
+        redis.call('ZADD', KEYS[1], 'NX', ARGV[i], ARGV[i + 1])
+    end
+end
+local picked = redis.call('ZRANGE', KEYS[1], 0, 0)
+if #picked == 0 then return false end
+redis.call('ZINCRBY', KEYS[1], 1, picked[1])
+return picked[1]
+"""
+
+# only touch agents already in the set; a missing set is seeded from the DB
+INCREMENT_MEMBER = """
+if redis.call('ZSCORE', KEYS[1], ARGV[1]) then
+    return redis.call('ZINCRBY', KEYS[1], ARGV[2], ARGV[1])
+end
+return false
+"""
+
+
+def _team_key(team):
+    return frappe.cache().make_key(TEAM_LOAD_KEY + team)
+
+
+def _team_agents(team):
+    users = frappe.get_all(
+        "HD Team Item", filters={"parent": team, "parenttype": "HD Team"}, pluck="user"
+    )
+    if not users:
+        return []
+    return frappe.get_all("HD Agent", filters={"name": ["in", users], "is_active": 1}, pluck="name")
+
+
+def _team_load(team):
+    """{agent: open assignments on active tickets} for the active agents of `team`."""
+    agents = _team_agents(team)
+    if not agents:
+        return {}
+
+    load = dict.fromkeys(agents, 0)
+    for user, count in frappe.db.sql(
+        """
+        select todo.allocated_to, count(*)
+        from `tabToDo` todo
+        join `tabHD Ticket` ticket on ticket.name = todo.reference_name
+        where todo.reference_type = 'HD Ticket' and todo.status = 'Open'
+            and ticket.status not in %(inactive)s and todo.allocated_to in %(agents)s
+        group by todo.allocated_to
+        """,
+        {"inactive": INACTIVE_TICKET_STATUSES, "agents": agents},
+    ):
+        load[user] = count
+    return load
+
+
+def _agent_teams(user):
+    def get_teams():
+        return frappe.get_all(
+            "HD Team Item", filters={"user": user, "parenttype": "HD Team"}, pluck="parent"
+        )
+
+    return frappe.cache().hget(AGENT_TEAMS_KEY, user, generator=get_teams)
+
+
+def _adjust_load(user, delta):
+    cache = frappe.cache()
+    increment = cache.register_script(INCREMENT_MEMBER)
+    for team in _agent_teams(user) or []:
+        increment(keys=[_team_key(team)], args=[user, delta])
+
+
+def _is_active_ticket(ticket):
+    status = frappe.db.get_value("HD Ticket", ticket, "status")
+    return bool(status) and status not in INACTIVE_TICKET_STATUSES
+
+
+def pick_agent(team):
+    """Least-loaded active agent of `team`, counted as one more ticket already."""
+    pick = frappe.cache().register_script(PICK_LEAST_LOADED)
+    key = _team_key(team)
+    agent = pick(keys=[key])
+    if not agent:
+        # missing set: count from the database and let the script seed it
+        # unless another worker got there first
+        load = _team_load(team)
+        if not load:
+            return None
+        agent = pick(keys=[key], args=[v for user, count in load.items() for v in (count, user)])
+    return agent.decode() if isinstance(agent, bytes) else agent
+
+
+def auto_assign_ticket(ticket):
+    """
+    Assign a newly created ticket to the least-loaded agent of its team,
+    unless it has no team or something (e.g. an assignment rule) already
+    assigned it. Returns the agent or None.
+    """
+    if not ticket.get("agent_group"):
+        return None
+    if json.loads(frappe.db.get_value("HD Ticket", ticket.name, "_assign") or "[]"):
+        return None
+
+    agent = pick_agent(ticket.agent_group)
+    if not agent:
+        return None
+
+    from frappe.desk.form.assign_to import add as add_assignment
+
+    # the pick already counted this ToDo, see on_todo_insert
+    frappe.flags.auto_assigned_todo = (str(ticket.name), agent)
+    try:
+        add_assignment(
+            {
+                "assign_to": [agent],
+                "doctype": "HD Ticket",
+                "name": ticket.name,
+                "description": ticket.get("subject"),
+            }
+        )
+    except Exception:
+        _adjust_load(agent, -1)
+        raise
+    finally:
+        frappe.flags.auto_assigned_todo = None
+    return agent
+
+
+def on_todo_insert(doc, method=None):
+    """ToDo after_insert"""
+    if doc.reference_type != "HD Ticket" or doc.status != "Open":
+        return
+    if frappe.flags.auto_assigned_todo == (str(doc.reference_name), doc.allocated_to):
+        return
+    if _is_active_ticket(doc.reference_name):
+        _adjust_load(doc.allocated_to, 1)
+
+
+def on_todo_update(doc, method=None):
+    """ToDo on_update: assignment closed, cancelled or reopened."""
+    if doc.reference_type != "HD Ticket" or not doc.has_value_changed("status"):
+        return
+    before = doc.get_doc_before_save()
+    if not before or "Open" not in (before.status, doc.status):
+        return
+    if _is_active_ticket(doc.reference_name):
+        _adjust_load(doc.allocated_to, 1 if doc.status == "Open" else -1)
+
+
+def on_todo_trash(doc, method=None):
+    """ToDo on_trash"""
+    if doc.reference_type == "HD Ticket" and doc.status == "Open" and _is_active_ticket(doc.reference_name):
+        _adjust_load(doc.allocated_to, -1)
+
+
+def on_ticket_status_change(doc, method=None):
+    """HD Ticket on_change: resolving frees the assignees, reopening loads them again."""
+    before = doc.get_doc_before_save()
+    if not before:
+        return
+    was_active = before.status not in INACTIVE_TICKET_STATUSES
+    is_active = doc.status not in INACTIVE_TICKET_STATUSES
+    if was_active == is_active:
+        return
+    for user in json.loads(doc.get("_assign") or "[]"):
+        _adjust_load(user, 1 if is_active else -1)
+
+
+def clear_team_loads(doc=None, method=None, *args, **kwargs):
+    """HD Team / HD Agent change and hourly: drop all sets, they re-seed on next pick."""
+    cache = frappe.cache()
+    cache.delete_keys(TEAM_LOAD_KEY)
+    cache.delete_value(AGENT_TEAMS_KEY)
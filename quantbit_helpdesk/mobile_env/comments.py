@@ -12,6 +12,7 @@ from mobile.mobile_env.app_utils import (
     get_global_defaults,
     exception_handel,
 )
+from quantbit_helpdesk.mobile_env.thumbnails import get_absolute_thumbnail_url
 
 
 @frappe.whitelist()
@@ -63,10 +64,7 @@ def get_data_from_notes(doc_name):
                 "User", i.added_by, "user_image", cache=True
             )
         frappe.msgprint(str1)
-        if str1 is not None:
-            note_dict['image'] = frappe.utils.get_url()+ str1
-        else:
-            note_dict['image'] = None
+        note_dict['image'] = get_absolute_thumbnail_url(str1)
         
         note_li.append(note_dict)
 
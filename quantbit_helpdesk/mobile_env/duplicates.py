@@ -0,0 +1,192 @@
+import hashlib
+import json
+import random
+import re
+import zlib
+
+import frappe
+
+from quantbit_helpdesk.mobile_env.app_utils import html_to_text
+
+# Near-duplicate detection with MinHash + LSH.
+#
+# A ticket's subject and description are reduced to word 3-gram shingles and
+# summarised by NUM_PERMUTATIONS min-hashes; the fraction of equal positions
+# between two signatures estimates their Jaccard similarity. The signature is
+# cut into LSH_BANDS bands whose hashes are stored as `Ticket Fingerprint
+# Band` rows with an index on band_key, so candidate tickets (sharing at least
+# one band) come from an indexed IN lookup instead of comparing against every
+# ticket. Candidates are then scored on their full signatures.
+#
+# 32 bands of 2 rows put a pair with similarity s in a shared bucket with
+# probability 1 - (1 - s^2)^32: ~99.99% at DUPLICATE_THRESHOLD (0.5), ~73%
+# at 0.2. The extra low-similarity candidates are cut by MAX_CANDIDATES and
+# the exact signature comparison.
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 32
+ROWS_PER_BAND = NUM_PERMUTATIONS // LSH_BANDS
+SHINGLE_SIZE = 3
+DUPLICATE_THRESHOLD = 0.5
+MAX_CANDIDATES = 50
+MAX_DUPLICATES = 5
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(20261018)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+
+def _shingles(text):
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < SHINGLE_SIZE:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i : i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def compute_signature(subject, description):
+    hashes = [zlib.crc32(s.encode()) for s in _shingles(f"{subject or ''} {html_to_text(description)}")]
+    if not hashes:
+        return None
+    return [min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def _band_keys(signature):
+    keys = []
+    for band in range(LSH_BANDS):
+        rows = signature[band * ROWS_PER_BAND : (band + 1) * ROWS_PER_BAND]
+        digest = hashlib.md5(json.dumps(rows).encode(), usedforsecurity=False).hexdigest()[:16]
+        keys.append(f"{band}:{digest}")
+    return keys
+
+
+def _similarity(a, b):
+    return sum(1 for x, y in zip(a, b, strict=True) if x == y) / NUM_PERMUTATIONS
+
+
+def _save_fingerprint(ticket, subject, description):
+    signature = compute_signature(subject, description)
+    if frappe.db.exists("Ticket Fingerprint", ticket):
+        fingerprint = frappe.get_doc("Ticket Fingerprint", ticket)
+    else:
+        fingerprint = frappe.new_doc("Ticket Fingerprint")
+        fingerprint.ticket = ticket
+
+    if not signature:
+        if not fingerprint.is_new():
+            fingerprint.delete(ignore_permissions=True)
+        return
+
+    fingerprint.signature = json.dumps(signature)
+    fingerprint.set("bands", [{"band_key": key} for key in _band_keys(signature)])
+    fingerprint.save(ignore_permissions=True)
+    return signature
+
+
+def index_ticket_fingerprint(doc, method=None):
+    """HD Ticket on_change: (re)compute the fingerprint when the text changed."""
+    before = doc.get_doc_before_save()
+    if before and before.subject == doc.subject and before.description == doc.description:
+        return
+    # find_duplicates in the same request reuses it
+    doc.flags.fingerprint_signature = _save_fingerprint(doc.name, doc.subject, doc.description)
+
+
+def remove_ticket_fingerprint(doc, method=None):
+    """HD Ticket on_trash"""
+    frappe.db.delete("Ticket Fingerprint Band", {"parent": doc.name, "parenttype": "Ticket Fingerprint"})
+    frappe.db.delete("Ticket Fingerprint", {"name": doc.name})
+
+
+def find_duplicates(ticket, limit=MAX_DUPLICATES, signature=None):
+    """
+    Tickets whose estimated Jaccard similarity with `ticket` (a doc or dict
+    with name, subject and description) is at least DUPLICATE_THRESHOLD,
+    most similar first. A signature computed by index_ticket_fingerprint for
+    a doc just saved, or passed in, is reused.
+    """
+    flags = getattr(ticket, "flags", None) or {}
+    signature = signature or flags.get("fingerprint_signature")
+    if not signature:
+        signature = compute_signature(ticket.get("subject"), ticket.get("description"))
+    if not signature:
+        return []
+
+    candidates = frappe.db.sql(
+        """
+        select parent, count(*) as shared_bands
+        from `tabTicket Fingerprint Band`
+        where parenttype = 'Ticket Fingerprint' and band_key in %(keys)s and parent != %(name)s
+        group by parent
+        order by shared_bands desc
+        limit %(limit)s
+        """,
+        {"keys": _band_keys(signature), "name": str(ticket.get("name") or ""), "limit": MAX_CANDIDATES},
+    )
+    if not candidates:
+        return []
+
+    scored = []
+    for name, candidate_signature in frappe.get_all(
+        "Ticket Fingerprint",
+        filters={"name": ["in", [c[0] for c in candidates]]},
+        fields=["name", "signature"],
+        as_list=True,
+    ):
+        score = _similarity(signature, json.loads(candidate_signature))
+        if score >= DUPLICATE_THRESHOLD:
+            scored.append((name, score))
+    scored.sort(key=lambda pair: pair[1], reverse=True)
+    scored = scored[:limit]
+    if not scored:
+        return []
+
+    tickets = {
+        str(t.name): t
+        for t in frappe.get_all(
+            "HD Ticket",
+            filters={"name": ["in", [name for name, _ in scored]]},
+            fields=["name", "subject", "status", "modified"],
+        )
+    }
+    return [
+        {**tickets[name], "similarity": round(score, 2)}
+        for name, score in scored
+        if name in tickets
+    ]
+
+
+@frappe.whitelist()
+def get_possible_duplicates(subject=None, description=None, name=None):
+    """Check a draft (or an existing ticket by name) for near-duplicates."""
+    signature = None
+    if name and not subject:
+        ticket = frappe.db.get_value("HD Ticket", name, ["name", "subject", "description"], as_dict=True)
+        if not ticket:
+            return {"status": "error", "code": 404, "message": f"Ticket with name {name} does not exist."}
+        stored = frappe.db.get_value("Ticket Fingerprint", name, "signature")
+        signature = json.loads(stored) if stored else None
+    else:
+        ticket = {"name": name, "subject": subject, "description": description}
+    return {"status": "success", "code": 200, "data": find_duplicates(ticket, signature=signature)}
+
+
+def rebuild_ticket_fingerprints():
+    """Fingerprint every ticket (backfill)."""
+    last_name = None
+    while True:
+        filters = [["name", ">", last_name]] if last_name else []
+        tickets = frappe.get_all(
+            "HD Ticket",
+            filters=filters,
+            fields=["name", "subject", "description"],
+            order_by="name asc",
+            limit_page_length=500,
+        )
+        if not tickets:
+            break
+        for ticket in tickets:
+            _save_fingerprint(ticket.name, ticket.subject, ticket.description)
+        frappe.db.commit()
+        last_name = tickets[-1].name
@@ -0,0 +1,144 @@
+import csv
+import io
+import json
+import zlib
+
+import frappe
+from frappe.utils import add_days, cint, now_datetime
+from werkzeug.wrappers import Response
+
+from quantbit_helpdesk.mobile_env.helpdesk import TICKET_LIST_FIELDS, _get_list_fields, _parse_assign
+
+# Ticket export streamed straight from an unbuffered (server-side) cursor:
+# the query is built and permission-checked inside the request, then the
+# response body is a generator that reads and encodes rows a batch at a
+# time, so memory stays flat and the header goes out before the first row
+# is fetched.
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+}
+EXPORT_FILTER_FIELDS = (
+    "status",
+    "priority",
+    "agent_group",
+    "ticket_type",
+    "custom_department",
+    "custom_sub_department",
+    "custom_module",
+    "custom_sub_module",
+    "custom_request_type",
+    "custom_environment_type",
+    "custom_development_state",
+)
+EXPORT_BATCH_SIZE = 500
+
+
+def _export_filters(filters, from_date, to_date):
+    if isinstance(filters, str):
+        filters = json.loads(filters) if filters else {}
+    filters = filters or {}
+
+    unknown = [f for f in filters if f not in EXPORT_FILTER_FIELDS]
+    if unknown:
+        raise frappe.ValidationError(f"Cannot filter on: {', '.join(unknown)}")
+
+    conditions = [
+        ["HD Ticket", field, "in" if isinstance(value, list) else "=", value]
+        for field, value in filters.items()
+    ]
+    if from_date:
+        conditions.append(["HD Ticket", "creation", ">=", from_date])
+    if to_date:
+        conditions.append(["HD Ticket", "creation", "<", add_days(to_date, 1)])
+    return conditions
+
+
+def _encode_rows(rows, fields, export_format):
+    buffer = io.StringIO()
+    if export_format == "csv":
+        writer = csv.writer(buffer)
+        writer.writerows(rows)
+    else:
+        for row in rows:
+            buffer.write(json.dumps(dict(zip(fields, row, strict=True)), default=str, ensure_ascii=False))
+            buffer.write("\n")
+    return buffer.getvalue().encode()
+
+
+def _stream(site, sites_path, user, query, fields, export_format, compress):
+    compressor = zlib.compressobj(wbits=31) if compress else None
+
+    def emit(data):
+        return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH) if compressor else data
+
+    if export_format == "csv":
+        yield emit(_encode_rows([fields], fields, "csv"))
+
+    # the request has already torn down its context by the time the body is read
+    frappe.init(site=site, sites_path=sites_path)
+    frappe.connect()
+    try:
+        frappe.set_user(user)
+        assign_index = fields.index("assigned_to") if "assigned_to" in fields else None
+        batch = []
+        with frappe.db.unbuffered_cursor():
+            for row in frappe.db.sql(query, as_iterator=True):
+                if assign_index is not None:
+                    row = list(row)
+                    row[assign_index] = ", ".join(_parse_assign(row[assign_index]))
+                batch.append(row)
+                if len(batch) >= EXPORT_BATCH_SIZE:
+                    yield emit(_encode_rows(batch, fields, export_format))
+                    batch = []
+        if batch:
+            yield emit(_encode_rows(batch, fields, export_format))
+        if compressor:
+            yield compressor.flush()
+    finally:
+        frappe.destroy()
+
+
+@frappe.whitelist()
+def export_tickets(format="csv", fields=None, filters=None, from_date=None, to_date=None, compress=0):
+    """
+    Stream tickets (oldest first) as CSV or NDJSON, optionally gzipped.
+
+    `fields` works as in get_hd_tickets; `filters` is a JSON object over
+    EXPORT_FILTER_FIELDS (a list value means "in"); from_date / to_date
+    bound the creation date.
+    """
+    if format not in EXPORT_FORMATS:
+        frappe.throw(f"Unsupported format {format}, use one of: {', '.join(EXPORT_FORMATS)}")
+    frappe.has_permission("HD Ticket", "export", throw=True)
+
+    fields = _get_list_fields(fields)
+    query = frappe.get_list(
+        "HD Ticket",
+        fields=[TICKET_LIST_FIELDS[f] or "_assign" for f in fields],
+        filters=_export_filters(filters, from_date, to_date),
+        order_by="creation asc, name asc",
+        run=0,
+    )
+
+    content_type, extension = EXPORT_FORMATS[format]
+    file_name = f"tickets-{now_datetime().strftime('%Y%m%d-%H%M%S')}.{extension}"
+    headers = {"X-Accel-Buffering": "no"}
+    if cint(compress):
+        content_type, file_name = "application/gzip", file_name + ".gz"
+    headers["Content-Disposition"] = f'attachment; filename="{file_name}"'
+
+    return Response(
+        _stream(
+            frappe.local.site,
+            frappe.local.sites_path,
+            frappe.session.user,
+            query,
+            fields,
+            format,
+            cint(compress),
+        ),
+        content_type=content_type,
+        headers=headers,
+        direct_passthrough=True,
+    )
@@ -1,57 +1,182 @@
 
+import base64
+import hashlib
+import json
+
 import frappe
-from frappe.utils import now
+from frappe.model import no_value_fields, table_fields
+from frappe.utils import add_to_date, cint, cstr, get_datetime, now, now_datetime
+
+from quantbit_helpdesk.mobile_env.app_utils import html_to_text
+from quantbit_helpdesk.mobile_env.archive import get_archived_ticket
+from quantbit_helpdesk.mobile_env.assignment import auto_assign_ticket
+from quantbit_helpdesk.mobile_env.duplicates import find_duplicates
+from quantbit_helpdesk.mobile_env.http import fast_response, match_etag, set_response_etag
+from quantbit_helpdesk.mobile_env.user_profile import get_user_profiles
+
+
+TICKET_FEED_FIELDS = [
+    "name", "subject", "status", "priority", "creation", "modified",
+    "agent_group", "ticket_type", "opening_date",
+    "resolution_date", "_assign", "description"
+]
+
+# Public field name -> column expression (None: computed after the query)
+TICKET_LIST_FIELDS = {
+    "name": "name",
+    "subject": "subject",
+    "status": "status",
+    "priority": "priority",
+    "creation": "creation",
+    "modified": "modified",
+    "agent_group": "agent_group",
+    "ticket_type": "ticket_type",
+    "opening_date": "opening_date",
+    "resolution_date": "resolution_date",
+    "custom_department": "custom_department",
+    "custom_module": "custom_module",
+    "custom_sub_module": "custom_sub_module",
+    "preview": "custom_preview as preview",
+    "description": "description",
+    "assigned_to": None,
+}
+DEFAULT_TICKET_LIST_FIELDS = [
+    "name", "subject", "status", "priority", "creation", "agent_group",
+    "ticket_type", "opening_date", "resolution_date", "assigned_to", "preview"
+]
+TICKET_PREVIEW_LENGTH = 200
+
+
+def _parse_assign(value, ticket_name=None):
+    if not value:
+        return []
+    try:
+        return json.loads(value) or []
+    except Exception:
+        frappe.log_error(frappe.get_traceback(), f"Error parsing _assign for ticket {ticket_name}")
+        return []
+
+
+def encode_cursor(*values):
+    """Pack the sort key of the last row into an opaque, url-safe token."""
+    payload = json.dumps([cstr(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, size=2):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except Exception:
+        values = None
+
+    if not isinstance(values, list) or len(values) != size:
+        raise frappe.ValidationError("Invalid cursor.")
+    return values
+
+
+def set_ticket_preview(doc, method=None):
+    """HD Ticket validate: keep the plain-text list preview in step with description."""
+    if doc.is_new() or doc.has_value_changed("description") or not doc.get("custom_preview"):
+        doc.custom_preview = html_to_text(doc.description, TICKET_PREVIEW_LENGTH)
+
 
+def _get_list_fields(fields):
+    """Validate a sparse fieldset (list, JSON list or comma separated string)."""
+    if not fields:
+        return DEFAULT_TICKET_LIST_FIELDS
+    if isinstance(fields, str):
+        fields = json.loads(fields) if fields.lstrip().startswith("[") else fields.split(",")
+    fields = [f.strip() for f in fields if f and f.strip()]
+
+    unknown = [f for f in fields if f not in TICKET_LIST_FIELDS]
+    if unknown:
+        raise frappe.ValidationError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
 
 
 @frappe.whitelist()
-def get_hd_tickets(user=None, status=None, priority=None, limit=20):
+def get_hd_tickets(user=None, status=None, priority=None, limit=20, cursor=None, fields=None):
+    """
+    Keyset-paginated ticket feed ordered by (modified, name), newest first.
+
+    Pass the `next_cursor` of a page as `cursor` to fetch the following page.
+    Rows touched after the first page was read move to the head of the feed,
+    so concurrent inserts never shift or repeat rows in later pages.
+
+    `fields` picks the columns to return, e.g. "name,subject,status,preview";
+    see TICKET_LIST_FIELDS. The full HTML description is only sent when
+    asked for explicitly.
+    """
     try:
-        filters = {}
+        try:
+            fields = _get_list_fields(fields)
+        except (frappe.ValidationError, ValueError) as e:
+            return {"error": str(e), "message": "Failed to retrieve tickets."}
+
+        # name and modified are always read for the cursor, _assign only when
+        # assigned_to is wanted
+        query_fields = {"name", "modified"}
+        query_fields.update(TICKET_LIST_FIELDS[f] for f in fields if TICKET_LIST_FIELDS[f])
+        if "assigned_to" in fields:
+            query_fields.add("_assign")
+
+        limit = cint(limit) or 20
+        filters = []
         if user:
-            filters["user"] = user
+            filters.append(["user", "=", user])
         if status:
-            filters["status"] = status
+            filters.append(["status", "=", status])
         if priority:
-            filters["priority"] = priority
-        
+            filters.append(["priority", "=", priority])
+
+        # (modified, name) < (last_modified, last_name), written so that the
+        # leading `modified <=` bound stays an index range condition
+        or_filters = None
+        if cursor:
+            try:
+                last_modified, last_name = decode_cursor(cursor)
+            except frappe.ValidationError as e:
+                return {"error": str(e), "message": "Failed to retrieve tickets."}
+            filters.append(["modified", "<=", last_modified])
+            or_filters = [["modified", "<", last_modified], ["name", "<", last_name]]
+
         tickets = frappe.get_all(
-            "HD Ticket", 
-            fields=[
-                "name", "subject", "status", "priority", "creation",
-                "agent_group", "ticket_type", "opening_date", 
-                "resolution_date", "_assign","description"
-            ],
+            "HD Ticket",
+            fields=list(query_fields),
             filters=filters,
-            limit_page_length=limit,
+            or_filters=or_filters,
+            order_by="modified desc, name desc",
+            limit_page_length=limit + 1,
         )
 
+        next_cursor = None
+        if len(tickets) > limit:
+            tickets = tickets[:limit]
+            next_cursor = encode_cursor(tickets[-1]["modified"], tickets[-1]["name"])
+
         if not tickets:
-            return {"message": "No tickets found.", "tickets": []}
+            return {"message": "No tickets found.", "tickets": [], "next_cursor": None}
         
-        for ticket in tickets:
-            if ticket.get("_assign"):
-                try:
-                    assigned_emails = json.loads(ticket["_assign"])
-                    if assigned_emails:
-                        # Get the first assigned user's full name
-                        assigned_user = frappe.db.get_value(
-                            "User",
-                            assigned_emails[0],
-                            "full_name"
-                        )
-                        ticket["assigned_to"] = assigned_user
-                    else:
-                        ticket["assigned_to"] = None
-                except Exception as e:
-                    frappe.log_error(frappe.get_traceback(), f"Error parsing _assign for ticket {ticket['name']}")
-                    ticket["assigned_to"] = None
-            else:
-                ticket["assigned_to"] = None
+        if "assigned_to" in fields:
+            first_assignees = {}
+            for ticket in tickets:
+                assigned_emails = _parse_assign(ticket.pop("_assign", None), ticket["name"])
+                if assigned_emails:
+                    first_assignees[ticket["name"]] = assigned_emails[0]
 
-            del ticket["_assign"]
+            profiles = get_user_profiles(first_assignees.values())
+            for ticket in tickets:
+                email = first_assignees.get(ticket["name"])
+                ticket["assigned_to"] = profiles[email]["full_name"] if email else None
 
-        return {"message": "Tickets retrieved successfully.", "tickets": tickets}
+        tickets = [{f: ticket.get(f) for f in fields} for ticket in tickets]
+
+        return {
+            "message": "Tickets retrieved successfully.",
+            "tickets": tickets,
+            "next_cursor": next_cursor,
+        }
 
     except Exception as e:
         frappe.log_error(frappe.get_traceback(), "Error in get_hd_tickets")
@@ -62,62 +187,249 @@ def get_hd_tickets(user=None, status=None, priority=None, limit=20):
 
 
 
-import json
+# Rows committed late can carry a `modified` slightly older than rows that
+# were already synced; a caught-up client re-reads this window on its next
+# call and de-duplicates by name.
+SYNC_OVERLAP_SECONDS = 10
+
+
 @frappe.whitelist()
-def save_ticket():
+def changes_since(watermark=None, user=None, limit=500):
+    """
+    Delta sync for HD Ticket.
+
+    Returns tickets modified after `watermark` (all tickets when omitted),
+    oldest first, plus tombstones for tickets deleted, archived or - when
+    `user` is given - unassigned from that user since then. Store the returned
+    `watermark` and pass it back on the next call; keep calling while
+    `has_more` is true.
+    """
     try:
-        ticket_data = frappe.local.form_dict
+        limit = cint(limit) or 500
+        since, last_name = decode_cursor(watermark) if watermark else (None, None)
 
-        if frappe.request.data:
-            ticket_data = json.loads(frappe.request.data)
+        filters = []
+        or_filters = None
+        if user:
+            filters.append(["_assign", "like", f'%"{user}"%'])
+        if since:
+            filters.append(["modified", ">=", since])
+            or_filters = [["modified", ">", since], ["name", ">", last_name]]
+
+        changes = frappe.get_all(
+            "HD Ticket",
+            fields=TICKET_FEED_FIELDS,
+            filters=filters,
+            or_filters=or_filters,
+            order_by="modified asc, name asc",
+            limit_page_length=limit + 1,
+        )
+
+        has_more = len(changes) > limit
+        if has_more:
+            changes = changes[:limit]
+            next_watermark = encode_cursor(changes[-1]["modified"], changes[-1]["name"])
         else:
-            ticket_data = frappe.form_dict
+            caught_up_at = add_to_date(now_datetime(), seconds=-SYNC_OVERLAP_SECONDS)
+            next_watermark = encode_cursor(caught_up_at, "")
+
+        for ticket in changes:
+            ticket["_assign"] = _parse_assign(ticket.get("_assign"), ticket["name"])
+
+        return {
+            "status": "success",
+            "changes": changes,
+            "tombstones": _get_ticket_tombstones(since, user) if since else [],
+            "watermark": next_watermark,
+            "has_more": has_more,
+        }
+
+    except frappe.ValidationError as e:
+        return {"status": "error", "code": 400, "message": str(e)}
+
+    except Exception as e:
+        frappe.log_error(frappe.get_traceback(), "Error in changes_since")
+        return {"status": "error", "code": 500, "message": str(e)}
+
+
+def _get_ticket_tombstones(since, user=None):
+    tombstones = [
+        {"name": d.deleted_name, "reason": "deleted"}
+        for d in frappe.get_all(
+            "Deleted Document",
+            filters={"deleted_doctype": "HD Ticket", "creation": [">", since]},
+            fields=["deleted_name"],
+        )
+    ]
+    # archived tickets leave HD Ticket without a Deleted Document
+    tombstones.extend(
+        {"name": name, "reason": "archived"}
+        for name in frappe.get_all("Archived Ticket", filters={"creation": [">", since]}, pluck="ticket")
+    )
+    if not user:
+        return tombstones
+
+    unassigned = {
+        d.reference_name
+        for d in frappe.get_all(
+            "ToDo",
+            filters={
+                "reference_type": "HD Ticket",
+                "allocated_to": user,
+                "status": "Cancelled",
+                "modified": [">", since],
+            },
+            fields=["reference_name"],
+        )
+    }
+    if unassigned:
+        # assigned back again since then - the ticket is still the user's
+        unassigned -= set(
+            frappe.get_all(
+                "HD Ticket",
+                filters=[["name", "in", list(unassigned)], ["_assign", "like", f'%"{user}"%']],
+                pluck="name",
+            )
+        )
+    tombstones.extend({"name": name, "reason": "unassigned"} for name in unassigned)
+    return tombstones
+
+
+MANDATORY_TICKET_FIELDS = ["subject", "priority"]
+TICKET_FIELDS_TO_MAP = [
+    "subject", "raised_by", "priority", "status", "ticket_type", "agent_group", 
+    "template", "sla", "response_by", "agreement_status", "resolution_by", 
+    "service_level_agreement_creation", "first_responded_on", "opening_date", 
+    "opening_time", "contact", "customer", "email_account", "via_customer_portal", 
+    "feedback_rating", "feedback_text", "feedback", "feedback_extra","custom_department",
+    "custom_module","custom_sub_module", "custom_environment_type", "custom_development_state",
+    "custom_sub_department", "custom_team", "custom_description", "custom_notes"
+]
+SAVE_TICKETS_CHUNK_SIZE = 100
+
+
+def _missing_ticket_fields(ticket_data):
+    return [field for field in MANDATORY_TICKET_FIELDS if not ticket_data.get(field)]
+
+
+def _apply_ticket_data(ticket, ticket_data):
+    for field in TICKET_FIELDS_TO_MAP:
+        if field in ticket_data and ticket_data[field] is not None:
+            ticket.set(field, ticket_data[field])
+
+
+def ticket_link_fields(fields=TICKET_FIELDS_TO_MAP):
+    """{fieldname: linked doctype} for the HD Ticket Link fields among `fields`."""
+    return {
+        df.fieldname: df.options
+        for df in frappe.get_meta("HD Ticket").get_link_fields()
+        if df.fieldname in fields
+    }
+
 
-        mandatory_fields = ["subject", "priority"]
-        missing_fields = [field for field in mandatory_fields if not ticket_data.get(field)]
-        if missing_fields:
+def existing_link_values(wanted):
+    """{doctype: set of names that exist} for {doctype: values}, one query per doctype."""
+    return {
+        doctype: {
+            str(name) for name in frappe.get_all(doctype, filters={"name": ["in", list(values)]}, pluck="name")
+        }
+        for doctype, values in wanted.items()
+        if values
+    }
+
+
+def find_invalid_ticket_links(rows):
+    """
+    Check every Link value in `rows` with one query per linked doctype.
+
+    Returns {row index: ["<field>: <doctype> <value> does not exist", ...]}.
+    """
+    link_fields = ticket_link_fields()
+
+    wanted = {}
+    for row in rows:
+        for field, doctype in link_fields.items():
+            if row.get(field):
+                wanted.setdefault(doctype, set()).add(row[field])
+
+    existing = existing_link_values(wanted)
+
+    errors = {}
+    for index, row in enumerate(rows):
+        for field, doctype in link_fields.items():
+            value = row.get(field)
+            if value and str(value) not in existing[doctype]:
+                errors.setdefault(index, []).append(f"{field}: {doctype} {value} does not exist")
+    return errors
+
+
+def _ticket_error(e):
+    if isinstance(e, frappe.DoesNotExistError):
+        return 404, str(e)
+    if isinstance(e, frappe.PermissionError):
+        return 403, f"Permission denied: {str(e)}"
+    if isinstance(e, frappe.DuplicateEntryError):
+        return 409, f"Duplicate entry: {str(e)}"
+    if isinstance(e, frappe.ValidationError):
+        return 422, f"Validation error: {str(e)}"
+    return 500, f"An unexpected error occurred: {str(e)}"
+
+
+def apply_save_ticket(ticket_data):
+    """
+    Body of save_ticket without the commit, for callers that batch several
+    writes (sync_mutations). Raises on save errors.
+    """
+    missing_fields = _missing_ticket_fields(ticket_data)
+    if missing_fields:
+        return {
+            "status": "error",
+            "code": 400,
+            "message": f"Missing mandatory fields: {', '.join(missing_fields)}",
+        }
+
+    if ticket_data.get("name"):
+        try:
+            ticket = frappe.get_doc("HD Ticket", ticket_data["name"])
+        except frappe.DoesNotExistError:
             return {
                 "status": "error",
-                "code": 400,
-                "message": f"Missing mandatory fields: {', '.join(missing_fields)}",
+                "code": 404,
+                "message": f"Ticket with name {ticket_data['name']} does not exist.",
             }
+    else:
+        ticket = frappe.new_doc("HD Ticket")
 
-    
-        if ticket_data.get("name"):
-            try:
-                ticket = frappe.get_doc("HD Ticket", ticket_data["name"])
-            except frappe.DoesNotExistError:
-                return {
-                    "status": "error",
-                    "code": 404,
-                    "message": f"Ticket with name {ticket_data['name']} does not exist.",
-                }
+    is_new = ticket.is_new()
+    _apply_ticket_data(ticket, ticket_data)
+
+    ticket.save()
+    assigned_to = auto_assign_ticket(ticket) if is_new else None
+
+    return {
+        "status": "success",
+        "code": 200,
+        "message": f"Ticket {ticket.name} saved successfully.",
+        "ticket_name": ticket.name,
+        "assigned_to": assigned_to,
+        "possible_duplicates": find_duplicates(ticket) if is_new else [],
+    }
+
+
+@frappe.whitelist()
+def save_ticket():
+    try:
+        ticket_data = frappe.local.form_dict
+
+        if frappe.request.data:
+            ticket_data = json.loads(frappe.request.data)
         else:
-            ticket = frappe.new_doc("HD Ticket")
-
-
-        fields_to_map = [
-            "subject", "raised_by", "priority", "status", "ticket_type", "agent_group", 
-            "template", "sla", "response_by", "agreement_status", "resolution_by", 
-            "service_level_agreement_creation", "first_responded_on", "opening_date", 
-            "opening_time", "contact", "customer", "email_account", "via_customer_portal", 
-            "feedback_rating", "feedback_text", "feedback", "feedback_extra","custom_department",
-            "custom_module","custom_sub_module", "custom_environment_type", "custom_development_state",
-            "custom_sub_department", "custom_team", "custom_description", "custom_notes"
-        ]
-        for field in fields_to_map:
-            if field in ticket_data and ticket_data[field] is not None:
-                ticket.set(field, ticket_data[field])
-
-        ticket.save()
-        frappe.db.commit()
+            ticket_data = frappe.form_dict
 
-        return {
-            "status": "success",
-            "code": 200,
-            "message": f"Ticket {ticket.name} saved successfully.",
-            "ticket_name": ticket.name,
-        }
+        result = apply_save_ticket(ticket_data)
+        if result["status"] == "success":
+            frappe.db.commit()
+        return result
 
     except frappe.ValidationError as e:
         frappe.log_error(frappe.get_traceback(), "Validation Error in Ticket")
@@ -154,29 +466,321 @@ def save_ticket():
 
 
 @frappe.whitelist()
-def get_helpdesk_masters():
+def save_tickets(batch=None, chunk_size=SAVE_TICKETS_CHUNK_SIZE):
+    """
+    Create or update many tickets in one call.
+
+    `batch` is a list of objects with the same fields as save_ticket (or the
+    JSON request body itself). Everything is validated before the first
+    write; valid items are then saved with one commit per `chunk_size` items,
+    each behind a savepoint so a failing item does not take its chunk down.
+    Returns one result per item, in input order.
+    """
     try:
-        response = {
-            "departments": [d["name"] for d in frappe.get_all("Quantbit Department", fields=["name"])],
-            "subdepartments": [sd["name"] for sd in frappe.get_all("SubDepartment", fields=["name"])],
-            "teams": [t["name"] for t in frappe.get_all("HD Team", fields=["name"])],
-            "environment_types": [e["name"] for e in frappe.get_all("Environment", fields=["name"])],
-            "modules": [m["name"] for m in frappe.get_all("Module", fields=["name"])],
-            "submodules": [ {"name": sm["name"], "module": sm["module"]} for sm in frappe.get_all("SubModule", fields=["name", "module"])
-             ],
-            "development_states": [ds["name"] for ds in frappe.get_all("Development State", fields=["name"])],
-            "ticket_types": [tt["name"] for tt in frappe.get_all("HD Ticket Type", fields=["name"])],
-            "priorities": [tt["name"] for tt in frappe.get_all("HD Ticket Priority", fields=["name"])],
-            'contacts': [c["name"] for c in frappe.get_all("Contact", fields=["name"])],
-            'customers': [c["name"] for c in frappe.get_all("HD Customer", fields=["name"])],
-            'sla': [s["name"] for s in frappe.get_all("HD Service Level Agreement", fields=["name"])],
-            'email_accounts': [ea["name"] for ea in frappe.get_all("Email Account", fields=["name"])],
-            'feedback_options': [ea["name"] for ea in frappe.get_all("HD Ticket Feedback Option", fields=["name"])]
+        if batch is None and frappe.request.data:
+            batch = json.loads(frappe.request.data)
+            if isinstance(batch, dict):
+                batch = batch.get("batch")
+        elif isinstance(batch, str):
+            batch = json.loads(batch)
+
+        if not isinstance(batch, list) or not batch:
+            return {"status": "error", "code": 400, "message": "batch must be a non-empty list."}
+
+        chunk_size = cint(chunk_size) or SAVE_TICKETS_CHUNK_SIZE
+        results = [None] * len(batch)
+
+        names = [item["name"] for item in batch if isinstance(item, dict) and item.get("name")]
+        existing = set()
+        if names:
+            existing = {
+                str(name) for name in frappe.get_all("HD Ticket", filters={"name": ["in", names]}, pluck="name")
+            }
+        invalid_links = find_invalid_ticket_links([item if isinstance(item, dict) else {} for item in batch])
+
+        for index, item in enumerate(batch):
+            if not isinstance(item, dict):
+                results[index] = {"index": index, "status": "error", "code": 400, "message": "Item must be an object."}
+            elif missing := _missing_ticket_fields(item):
+                results[index] = {
+                    "index": index,
+                    "status": "error",
+                    "code": 400,
+                    "message": f"Missing mandatory fields: {', '.join(missing)}",
+                }
+            elif item.get("name") and str(item["name"]) not in existing:
+                results[index] = {
+                    "index": index,
+                    "status": "error",
+                    "code": 404,
+                    "message": f"Ticket with name {item['name']} does not exist.",
+                }
+            elif index in invalid_links:
+                results[index] = {
+                    "index": index,
+                    "status": "error",
+                    "code": 422,
+                    "message": "; ".join(invalid_links[index]),
+                }
 
+        pending = [index for index, result in enumerate(results) if result is None]
+        for start in range(0, len(pending), chunk_size):
+            for index in pending[start : start + chunk_size]:
+                item = batch[index]
+                savepoint = f"save_tickets_{index}"
+                frappe.db.savepoint(savepoint)
+                try:
+                    if item.get("name"):
+                        ticket = frappe.get_doc("HD Ticket", item["name"])
+                    else:
+                        ticket = frappe.new_doc("HD Ticket")
+                    is_new = ticket.is_new()
+                    _apply_ticket_data(ticket, item)
+                    ticket.save()
+                    results[index] = {
+                        "index": index,
+                        "status": "success",
+                        "code": 200,
+                        "ticket_name": ticket.name,
+                        "assigned_to": auto_assign_ticket(ticket) if is_new else None,
+                    }
+                except Exception as e:
+                    frappe.db.rollback(save_point=savepoint)
+                    frappe.log_error(frappe.get_traceback(), "Error in save_tickets")
+                    code, message = _ticket_error(e)
+                    results[index] = {"index": index, "status": "error", "code": code, "message": message}
+            frappe.db.commit()
+
+        failed = sum(1 for result in results if result["status"] == "error")
+        return {
+            "status": "success" if not failed else "partial",
+            "code": 200,
+            "message": f"{len(results) - failed} of {len(results)} tickets saved.",
+            "results": results,
         }
+
+    except Exception as e:
+        frappe.log_error(frappe.get_traceback(), "Unexpected Error in save_tickets")
+        return {
+            "status": "error",
+            "code": 500,
+            "message": f"An unexpected error occurred: {str(e)}",
+        }
+
+
+# Fields that only classify a ticket: nothing in the HD Ticket controller
+# reacts to them, so patch_ticket writes them with db_set() instead of a full
+# save().
+LEAN_PATCH_FIELDS = {
+    "ticket_type", "custom_department", "custom_sub_department", "custom_module",
+    "custom_sub_module", "custom_environment_type", "custom_development_state",
+    "feedback_text", "feedback_extra"
+}
+# status and priority also take the lean path, but the SLA they drive is
+# recomputed explicitly (HD Service Level Agreement.apply) and every field it
+# derives is written along with them. Other validate/on_update logic of the
+# HD Ticket controller (notifications, activity) is skipped on this path.
+SLA_PATCH_FIELDS = {"status", "priority"}
+
+
+def _invalid_select_values(changes):
+    meta = frappe.get_meta("HD Ticket")
+    errors = []
+    for field, value in changes.items():
+        df = meta.get_field(field)
+        if df and df.fieldtype == "Select" and value and value not in cstr(df.options).split("\n"):
+            errors.append(f"{field}: {value} is not a valid option")
+    return errors
+
+
+def _lean_patch(ticket, changed):
+    """Write `changed` (plus SLA-derived fields) with one db_set instead of save()."""
+    before = frappe.get_doc(ticket.as_dict())
+    ticket._doc_before_save = before
+    ticket.update(changed)
+    if set(changed) & SLA_PATCH_FIELDS and ticket.get("sla"):
+        frappe.get_doc("HD Service Level Agreement", ticket.sla).apply(ticket)
+
+    values = {
+        df.fieldname: ticket.get(df.fieldname)
+        for df in ticket.meta.fields
+        if df.fieldtype not in no_value_fields
+        and df.fieldtype not in table_fields
+        and cstr(ticket.get(df.fieldname)) != cstr(before.get(df.fieldname))
+    }
+    # db_set runs the on_change hooks (SLA queue, counters, realtime, ...)
+    ticket.db_set(values, notify=True)
+    ticket.save_version()
+
+
+@frappe.whitelist()
+def patch_ticket(name=None, modified=None, changes=None):
+    """
+    Partial ticket update with optimistic concurrency.
+
+    `modified` is the version token the client last read; if the ticket has
+    changed since, nothing is written and 409 is returned with the current
+    token. Only fields whose value actually differs are written. When all
+    of them are in LEAN_PATCH_FIELDS or SLA_PATCH_FIELDS the update is one
+    db_set (SLA recomputed, version still recorded), otherwise the ticket
+    goes through save().
+    """
+    try:
+        if frappe.request and frappe.request.data and not changes:
+            body = json.loads(frappe.request.data)
+            name, modified, changes = body.get("name"), body.get("modified"), body.get("changes")
+        elif isinstance(changes, str):
+            changes = json.loads(changes)
+
+        if not name or not modified or not isinstance(changes, dict) or not changes:
+            return {
+                "status": "error",
+                "code": 400,
+                "message": "name, modified and a non-empty changes object are required.",
+            }
+
+        meta = frappe.get_meta("HD Ticket")
+        unknown = [field for field in changes if field not in TICKET_FIELDS_TO_MAP or not meta.has_field(field)]
+        if unknown:
+            return {"status": "error", "code": 400, "message": f"Unknown fields: {', '.join(unknown)}"}
+
+        if not frappe.db.exists("HD Ticket", name):
+            return {"status": "error", "code": 404, "message": f"Ticket with name {name} does not exist."}
+        # before anything of the ticket (version, values) is read back
+        frappe.has_permission("HD Ticket", "write", name, throw=True)
+
+        # lock the row so the version check and the write are atomic
+        current = frappe.db.get_value(
+            "HD Ticket", name, ["modified", *changes], as_dict=True, for_update=True
+        )
+        if not current:
+            return {"status": "error", "code": 404, "message": f"Ticket with name {name} does not exist."}
+
+        if get_datetime(current.modified) != get_datetime(modified):
+            return {
+                "status": "error",
+                "code": 409,
+                "message": "Ticket was modified by someone else, reload and retry.",
+                "modified": cstr(current.modified),
+            }
+
+        changed = {field: value for field, value in changes.items() if cstr(current.get(field)) != cstr(value)}
+        if not changed:
+            return {
+                "status": "success",
+                "code": 200,
+                "ticket_name": name,
+                "modified": cstr(current.modified),
+                "changed": [],
+            }
+
+        invalid_links = find_invalid_ticket_links([changed])
+        if invalid_links:
+            return {"status": "error", "code": 422, "message": "; ".join(invalid_links[0])}
+        invalid_options = _invalid_select_values(changed)
+        if invalid_options:
+            return {"status": "error", "code": 422, "message": "; ".join(invalid_options)}
+
+        ticket = frappe.get_doc("HD Ticket", name)
+        if set(changed) <= LEAN_PATCH_FIELDS | SLA_PATCH_FIELDS:
+            _lean_patch(ticket, changed)
+        else:
+            ticket.update(changed)
+            ticket.save()
+        frappe.db.commit()
+
         return {
             "status": "success",
-            "data": response
+            "code": 200,
+            "ticket_name": ticket.name,
+            "modified": cstr(ticket.modified),
+            "changed": list(changed),
+        }
+
+    except Exception as e:
+        frappe.db.rollback()
+        frappe.log_error(frappe.get_traceback(), "Error in patch_ticket")
+        code, message = _ticket_error(e)
+        return {"status": "error", "code": code, "message": message}
+
+
+# Every doctype read by _build_helpdesk_masters; their on_update / on_trash /
+# after_rename hooks call clear_helpdesk_masters_cache (see hooks.py)
+HELPDESK_MASTER_DOCTYPES = [
+    "Quantbit Department", "SubDepartment", "HD Team", "Environment", "Module",
+    "SubModule", "Development State", "HD Ticket Type", "HD Ticket Priority",
+    "Contact", "HD Customer", "HD Service Level Agreement", "Email Account",
+    "HD Ticket Feedback Option"
+]
+HELPDESK_MASTERS_CACHE_KEY = "quantbit_helpdesk:helpdesk_masters"
+
+
+def _build_helpdesk_masters():
+    return {
+        "departments": [d["name"] for d in frappe.get_all("Quantbit Department", fields=["name"])],
+        "subdepartments": [sd["name"] for sd in frappe.get_all("SubDepartment", fields=["name"])],
+        "teams": [t["name"] for t in frappe.get_all("HD Team", fields=["name"])],
+        "environment_types": [e["name"] for e in frappe.get_all("Environment", fields=["name"])],
+        "modules": [m["name"] for m in frappe.get_all("Module", fields=["name"])],
+        "submodules": [ {"name": sm["name"], "module": sm["module"]} for sm in frappe.get_all("SubModule", fields=["name", "module"])
+         ],
+        "development_states": [ds["name"] for ds in frappe.get_all("Development State", fields=["name"])],
+        "ticket_types": [tt["name"] for tt in frappe.get_all("HD Ticket Type", fields=["name"])],
+        "priorities": [tt["name"] for tt in frappe.get_all("HD Ticket Priority", fields=["name"])],
+        'contacts': [c["name"] for c in frappe.get_all("Contact", fields=["name"])],
+        'customers': [c["name"] for c in frappe.get_all("HD Customer", fields=["name"])],
+        'sla': [s["name"] for s in frappe.get_all("HD Service Level Agreement", fields=["name"])],
+        'email_accounts': [ea["name"] for ea in frappe.get_all("Email Account", fields=["name"])],
+        'feedback_options': [ea["name"] for ea in frappe.get_all("HD Ticket Feedback Option", fields=["name"])]
+
+    }
+
+
+def get_helpdesk_masters_snapshot():
+    """{"version", "data"} from Redis, rebuilt on a miss. version is a hash of data."""
+    snapshot = frappe.cache().get_value(HELPDESK_MASTERS_CACHE_KEY)
+    if snapshot:
+        return snapshot
+
+    data = _build_helpdesk_masters()
+    version = hashlib.sha1(
+        json.dumps(data, sort_keys=True, default=str).encode(), usedforsecurity=False
+    ).hexdigest()
+    snapshot = {"version": version, "data": data}
+    frappe.cache().set_value(HELPDESK_MASTERS_CACHE_KEY, snapshot)
+    return snapshot
+
+
+def clear_helpdesk_masters_cache(doc=None, method=None, *args, **kwargs):
+    frappe.cache().delete_value(HELPDESK_MASTERS_CACHE_KEY)
+
+
+@frappe.whitelist()
+@fast_response
+def get_helpdesk_masters():
+    """
+    Master data for the ticket form, served from a cached snapshot.
+
+    The response carries an ETag with the snapshot version (suffixed with
+    the coding for compressed bodies); a request whose If-None-Match names
+    either form gets an empty 304 instead of the payload.
+    """
+    try:
+        snapshot = get_helpdesk_masters_snapshot()
+        etag = f'"{snapshot["version"]}"'
+        set_response_etag(etag)
+
+        matched = match_etag(etag)
+        if matched:
+            # echo the variant the client holds (plain, -gzip or -br)
+            set_response_etag(matched)
+            frappe.local.response["http_status_code"] = 304
+            return
+
+        return {
+            "status": "success",
+            "version": snapshot["version"],
+            "data": snapshot["data"]
         }
 
     except Exception as e:
@@ -187,6 +791,84 @@ def get_helpdesk_masters():
         }
 
 
+@frappe.whitelist()
+def get_submodules(module):
+    """SubModules of one Module, for the cascading picker on the ticket form."""
+    return {
+        "status": "success",
+        "data": frappe.get_all("SubModule", filters={"module": module}, pluck="name", order_by="name asc"),
+    }
+
+
+@frappe.whitelist()
+def get_subdepartments(department):
+    """SubDepartments of one Quantbit Department."""
+    return {
+        "status": "success",
+        "data": frappe.get_all(
+            "SubDepartment", filters={"department": department}, pluck="name", order_by="name asc"
+        ),
+    }
+
+
+def _prefix_search(doctype, search_field, txt, fields, after=None, page_length=20):
+    """
+    `search_field LIKE 'txt%'` ordered by (search_field, name), keyset
+    paginated, over the rows the current user may read.
+
+    Returns (rows, next_cursor); pass next_cursor back as `after`.
+    """
+    page_length = min(cint(page_length) or 20, 100)
+    # the typed text is matched literally: LIKE wildcards and the escape char are escaped
+    prefix = cstr(txt).replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    filters = [[search_field, "like", f"{prefix}%"]]
+    or_filters = None
+    if after:
+        last_value, last_name = decode_cursor(after)
+        filters.append([search_field, ">=", last_value])
+        or_filters = [[search_field, ">", last_value], ["name", ">", last_name]]
+
+    rows = frappe.get_list(
+        doctype,
+        filters=filters,
+        or_filters=or_filters,
+        fields=fields,
+        order_by=f"{search_field} asc, name asc",
+        limit_page_length=page_length + 1,
+    )
+    next_cursor = None
+    if len(rows) > page_length:
+        rows = rows[:page_length]
+        next_cursor = encode_cursor(rows[-1][search_field], rows[-1]["name"])
+    return rows, next_cursor
+
+
+@frappe.whitelist()
+def search_contacts(txt="", after=None, page_length=20):
+    """Typeahead for Contact by full name prefix (indexed, see patches)."""
+    try:
+        rows, next_cursor = _prefix_search(
+            "Contact", "full_name", txt, ["name", "full_name", "email_id"], after, page_length
+        )
+        return {"status": "success", "data": rows, "next_cursor": next_cursor}
+    except frappe.PermissionError as e:
+        return {"status": "error", "code": 403, "message": str(e)}
+    except frappe.ValidationError as e:
+        return {"status": "error", "code": 400, "message": str(e)}
+
+
+@frappe.whitelist()
+def search_customers(txt="", after=None, page_length=20):
+    """Typeahead for HD Customer by name prefix (primary key range)."""
+    try:
+        rows, next_cursor = _prefix_search("HD Customer", "name", txt, ["name"], after, page_length)
+        return {"status": "success", "data": rows, "next_cursor": next_cursor}
+    except frappe.PermissionError as e:
+        return {"status": "error", "code": 403, "message": str(e)}
+    except frappe.ValidationError as e:
+        return {"status": "error", "code": 400, "message": str(e)}
+
+
 @frappe.whitelist()
 def get_ticket_details(helpdeskid):
     try:
@@ -198,6 +880,13 @@ def get_ticket_details(helpdeskid):
             }
 
         if not frappe.db.exists("HD Ticket", helpdeskid):
+            archived = get_archived_ticket(helpdeskid)
+            if archived:
+                return {
+                    "status": "success",
+                    "code": 200,
+                    "data": {**archived.ticket, **archived.children, "archived": 1},
+                }
             return {
                 "status": "error",
                 "code": 404,
@@ -229,6 +918,181 @@ def get_ticket_details(helpdeskid):
         }
 
 
+TICKET_BUNDLE_FIELDS = [
+    "name", "subject", "status", "priority", "ticket_type", "agent_group",
+    "raised_by", "contact", "customer", "description", "opening_date",
+    "opening_time", "response_by", "resolution_by", "agreement_status",
+    "first_responded_on", "resolution_date", "creation", "modified", "_assign",
+    "custom_department", "custom_sub_department", "custom_module",
+    "custom_sub_module", "custom_environment_type", "custom_development_state",
+    "custom_request_type"
+]
+COMMUNICATION_FIELDS = ["name", "communication_type", "content", "subject", "sender", "creation"]
+COMMUNICATION_PAGE_LENGTH = 20
+
+
+def _attach_files(communications):
+    """Set `attachments` on every communication using one File query."""
+    files_by_name = {}
+    if communications:
+        for f in frappe.get_all(
+            "File",
+            filters={
+                "attached_to_doctype": "Communication",
+                "attached_to_name": ["in", [c["name"] for c in communications]],
+            },
+            fields=["attached_to_name", "file_url", "file_name"],
+        ):
+            files_by_name.setdefault(f.pop("attached_to_name"), []).append(f)
+
+    for comm in communications:
+        comm["attachments"] = files_by_name.get(comm["name"], [])
+    return communications
+
+
+def _get_communication_page(ticket, limit=COMMUNICATION_PAGE_LENGTH, cursor=None, direction="older"):
+    """
+    One page of a ticket's thread, keyset paginated on (creation, name).
+
+    direction="older" walks back from `cursor` (from the newest message when
+    no cursor is given), "newer" walks forward (from the first message).
+    Messages are always returned oldest first; `older_cursor`/`newer_cursor`
+    point at the page boundaries for the next call in either direction.
+    """
+    if direction not in ("older", "newer"):
+        raise frappe.ValidationError("direction must be older or newer.")
+
+    older = direction == "older"
+    filters = [["reference_doctype", "=", "HD Ticket"], ["reference_name", "=", ticket]]
+    or_filters = None
+    if cursor:
+        last_creation, last_name = decode_cursor(cursor)
+        op = "<" if older else ">"
+        filters.append(["creation", f"{op}=", last_creation])
+        or_filters = [["creation", op, last_creation], ["name", op, last_name]]
+
+    order = "desc" if older else "asc"
+    communications = frappe.get_all(
+        "Communication",
+        filters=filters,
+        or_filters=or_filters,
+        fields=COMMUNICATION_FIELDS,
+        order_by=f"creation {order}, name {order}",
+        limit_page_length=limit + 1,
+    )
+    overflow = len(communications) > limit
+    communications = communications[:limit]
+    if older:
+        communications.reverse()
+    return _communication_page(communications, overflow, older, cursor)
+
+
+def _get_archived_communication_page(archived, limit=COMMUNICATION_PAGE_LENGTH, cursor=None, direction="older"):
+    """_get_communication_page over the thread stored in an archive payload."""
+    if direction not in ("older", "newer"):
+        raise frappe.ValidationError("direction must be older or newer.")
+
+    older = direction == "older"
+    # archived threads are stored sorted by (creation, name)
+    thread = [frappe._dict({f: c.get(f) for f in COMMUNICATION_FIELDS}) for c in archived.communications]
+    if cursor:
+        boundary = tuple(decode_cursor(cursor))
+
+        def sort_key(c):
+            return (cstr(c.creation), cstr(c.name))
+
+        thread = [c for c in thread if (sort_key(c) < boundary if older else sort_key(c) > boundary)]
+    overflow = len(thread) > limit
+    communications = thread[-limit:] if older else thread[:limit]
+    return _communication_page(communications, overflow, older, cursor)
+
+
+def _communication_page(communications, overflow, older, cursor):
+    first, last = (communications[0], communications[-1]) if communications else (None, None)
+    return {
+        "communications": _attach_files(communications),
+        "has_older": overflow if older else bool(cursor),
+        "has_newer": bool(cursor) if older else overflow,
+        "older_cursor": encode_cursor(first["creation"], first["name"]) if first else cursor,
+        "newer_cursor": encode_cursor(last["creation"], last["name"]) if last else cursor,
+    }
+
+
+def _get_ticket_notes(ticket):
+    notes_field = frappe.get_meta("HD Ticket").get_field("notes")
+    if not notes_field:
+        return []
+    return frappe.get_all(
+        notes_field.options,
+        filters={"parent": ticket, "parenttype": "HD Ticket", "parentfield": "notes"},
+        fields=["name", "note", "added_by", "creation"],
+        order_by="idx asc",
+    )
+
+
+@frappe.whitelist()
+def get_ticket_bundle(helpdeskid):
+    """
+    Everything the mobile ticket screen needs in one request: a projection of
+    the ticket, its latest messages with attachments, its notes and resolved
+    assignees. Costs a fixed number of queries regardless of thread length.
+    """
+    try:
+        if not helpdeskid:
+            return {"status": "error", "code": 400, "message": "helpdeskid is required."}
+
+        tickets = frappe.get_list(
+            "HD Ticket", filters={"name": helpdeskid}, fields=TICKET_BUNDLE_FIELDS, limit_page_length=1
+        )
+        if tickets:
+            ticket = tickets[0]
+            thread = _get_communication_page(ticket.name)
+            notes = _get_ticket_notes(ticket.name)
+        else:
+            archived = get_archived_ticket(helpdeskid)
+            if not archived:
+                return {
+                    "status": "error",
+                    "code": 404,
+                    "message": f"Ticket with id {helpdeskid} does not exist.",
+                }
+            ticket = frappe._dict({f: archived.ticket.get(f) for f in TICKET_BUNDLE_FIELDS}, archived=1)
+            thread = _get_archived_communication_page(archived)
+            notes = [
+                frappe._dict({f: n.get(f) for f in ("name", "note", "added_by", "creation")})
+                for n in archived.children.get("notes", [])
+            ]
+
+        assignees = _parse_assign(ticket.pop("_assign", None), ticket.name)
+        profiles = get_user_profiles([*assignees, *(n.added_by for n in notes)])
+        for note in notes:
+            note["added_by_name"] = profiles.get(note.added_by, {}).get("full_name")
+
+        return {
+            "status": "success",
+            "code": 200,
+            "data": {
+                "ticket": ticket,
+                "assignees": [{"user": user, **profiles[user]} for user in assignees],
+                "communications": thread["communications"],
+                "has_older_communications": thread["has_older"],
+                "older_cursor": thread["older_cursor"],
+                "notes": notes,
+            },
+        }
+
+    except frappe.PermissionError as e:
+        return {"status": "error", "code": 403, "message": f"Permission denied: {str(e)}"}
+
+    except Exception as e:
+        frappe.log_error(frappe.get_traceback(), "Unexpected Error in get_ticket_bundle")
+        return {
+            "status": "error",
+            "code": 500,
+            "message": f"An unexpected error occurred: {str(e)}",
+        }
+
+
 @frappe.whitelist()
 def get_all_hd_agent_names():
     try:
@@ -266,30 +1130,37 @@ def get_ticket_type_and_agent():
 
 
 @frappe.whitelist()
-def get_communications(name):
+def get_communications(name, limit=None, cursor=None, direction="older"):
+    """
+    Messages of a ticket with their attachments (one File query per call).
+
+    Without `limit` the whole thread is returned as a list, oldest first.
+    With `limit` a single page is returned instead, see _get_communication_page.
+    """
+    if cint(limit):
+        page = _get_communication_page(name, cint(limit), cursor, direction)
+        if not page["communications"] and not frappe.db.exists("HD Ticket", name):
+            archived = get_archived_ticket(name)
+            if archived:
+                return _get_archived_communication_page(archived, cint(limit), cursor, direction)
+        return page
+
     communications = frappe.get_all(
         "Communication",
         filters={
             "reference_doctype": "HD Ticket",
             "reference_name": name
         },
-        fields=["name", "communication_type", "content", "subject", "sender", "creation"],
+        fields=COMMUNICATION_FIELDS,
         order_by="creation asc"
     )
-
-    for comm in communications:
-        # Get files attached to this communication
-        files = frappe.get_all(
-            "File",
-            filters={
-                "attached_to_doctype": "Communication",
-                "attached_to_name": comm["name"]
-            },
-            fields=["file_url", "file_name"]
-        )
-        comm["attachments"] = files
-
-    return communications
+    if not communications and not frappe.db.exists("HD Ticket", name):
+        archived = get_archived_ticket(name)
+        if archived:
+            communications = [
+                frappe._dict({f: c.get(f) for f in COMMUNICATION_FIELDS}) for c in archived.communications
+            ]
+    return _attach_files(communications)
 
 
 
@@ -337,14 +1208,19 @@ def create_or_update_communication(**kwargs):
         })
         comm_doc.insert()
 
-    # Attach files if any
+    # Attach files if any: one permission-filtered lookup (files the caller
+    # may not access count as missing) and one UPDATE for the whole set
     if data.get("attachments"):
-        for file in data["attachments"]:
-            if not frappe.db.exists("File", file.get("name")):
-                raise frappe.DoesNotExistError(f"File not found: {file.get('name')}")
-            file_doc = frappe.get_doc("File", file["name"])
-            file_doc.attached_to_doctype = "Communication"
-            file_doc.attached_to_name = comm_doc.name
-            file_doc.save()
+        file_names = [file.get("name") for file in data["attachments"]]
+        allowed = set(frappe.get_list("File", filters={"name": ["in", file_names]}, pluck="name"))
+        missing = [name for name in file_names if name not in allowed]
+        if missing:
+            raise frappe.DoesNotExistError(f"File not found: {', '.join(map(str, missing))}")
+
+        frappe.db.set_value(
+            "File",
+            {"name": ["in", file_names]},
+            {"attached_to_doctype": "Communication", "attached_to_name": comm_doc.name},
+        )
 
     return comm_doc
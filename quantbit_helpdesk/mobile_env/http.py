@@ -0,0 +1,145 @@
+import functools
+import gzip
+import inspect
+import json
+
+import frappe
+from frappe.utils import cint
+from frappe.utils.response import make_logs
+from werkzeug.wrappers import Response
+
+CONTENT_CODINGS = ("gzip", "br")
+
+
+def set_response_etag(etag):
+    """Have the current response carry `etag` (applied in after_request)."""
+    frappe.local.flags.mobile_response_etag = etag
+
+
+def encoded_etag(etag, coding):
+    """Entity tag of the `coding` variant of a body: "v" -> "v-gzip"."""
+    return f'{etag[:-1]}-{coding}"' if etag.endswith('"') else f"{etag}-{coding}"
+
+
+def match_etag(etag):
+    """
+    The tag from If-None-Match that names `etag` or one of its
+    Content-Encoding variants, else None. Comparison is weak, as RFC 9110
+    requires for If-None-Match.
+    """
+    variants = {etag, *(encoded_etag(etag, coding) for coding in CONTENT_CODINGS)}
+    for tag in (frappe.get_request_header("If-None-Match") or "").split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return etag
+        tag = tag.removeprefix("W/")
+        if tag in variants:
+            return tag
+    return None
+
+
+def after_request(response=None, request=None):
+    if response is None:
+        return
+
+    etag = frappe.local.flags.get("mobile_response_etag")
+    if etag:
+        # a compressed body is a different representation and needs its own
+        # strong validator (RFC 9110 8.8.3)
+        coding = response.headers.get("Content-Encoding")
+        response.headers["ETag"] = encoded_etag(etag, coding) if coding else etag
+        # let clients keep the body but always revalidate it
+        response.headers["Cache-Control"] = "private, no-cache"
+        if response.status_code == 304:
+            response.set_data(b"")
+
+
+# Opt-in fast path for large mobile responses: endpoints decorated with
+# fast_response are serialized with orjson and compressed with brotli or
+# gzip according to Accept-Encoding, instead of going through Frappe's
+# json.dumps and an uncompressed body. The body has the same shape Frappe
+# would send ({"message": ..., plus whatever gen_response put into
+# frappe.response}) and values are formatted by Frappe's json_handler, so
+# clients see no difference besides Content-Encoding.
+COMPRESSION_MIN_SIZE = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def _dumps(body):
+    from frappe.utils.response import json_handler
+
+    try:
+        import orjson
+    except ImportError:
+        return json.dumps(body, default=json_handler, separators=(",", ":")).encode()
+
+    # datetimes go through json_handler to keep Frappe's "YYYY-MM-DD HH:MM:SS" format
+    return orjson.dumps(
+        body,
+        default=json_handler,
+        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+    )
+
+
+def _accepted_encodings():
+    header = frappe.get_request_header("Accept-Encoding") or ""
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        if coding and params.replace(" ", "") not in ("q=0", "q=0.0"):
+            accepted.add(coding.lower())
+    return accepted
+
+
+def _compress(data):
+    """(body, Content-Encoding or None) for the best encoding the client accepts."""
+    if len(data) < COMPRESSION_MIN_SIZE:
+        return data, None
+    accepted = _accepted_encodings()
+    if "br" in accepted:
+        try:
+            import brotli
+        except ImportError:
+            pass
+        else:
+            return brotli.compress(data, quality=BROTLI_QUALITY), "br"
+    if "gzip" in accepted:
+        return gzip.compress(data, compresslevel=GZIP_LEVEL), "gzip"
+    return data, None
+
+
+def _accepted_kwargs(fn, kwargs):
+    parameters = inspect.signature(fn).parameters.values()
+    if any(p.kind == inspect.Parameter.VAR_KEYWORD for p in parameters):
+        return kwargs
+    names = {p.name for p in parameters}
+    return {k: v for k, v in kwargs.items() if k in names}
+
+
+def fast_response(fn):
+    """Serve `fn` (a whitelisted endpoint) through the orjson + compression path."""
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        # frappe.call cannot see through the wrapper and passes the whole form_dict
+        result = fn(*args, **_accepted_kwargs(fn, kwargs))
+        if isinstance(result, Response):
+            return result
+
+        make_logs()
+        body = {k: v for k, v in frappe.local.response.items() if k not in ("http_status_code", "docs")}
+        if result is not None:
+            body["message"] = result
+        status = cint(frappe.local.response.get("http_status_code")) or 200
+
+        response = Response(status=status, content_type="application/json; charset=utf-8")
+        response.headers["Vary"] = "Accept-Encoding"
+        if status != 304:
+            data, encoding = _compress(_dumps(body))
+            response.set_data(data)
+            if encoding:
+                response.headers["Content-Encoding"] = encoding
+        return response
+
+    return wrapper
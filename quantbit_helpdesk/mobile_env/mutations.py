@@ -0,0 +1,234 @@
+import hashlib
+import json
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import add_days, cint, cstr, now
+
+from quantbit_helpdesk.mobile_env.helpdesk import _ticket_error, apply_save_ticket
+
+# Offline mutation replay for the mobile app.
+#
+# The client queues writes while offline and sends them in order in one
+# sync_mutations call. Every mutation carries an idempotency key; the
+# outcome of each successful one is stored in `Mobile Mutation` inside the
+# same savepoint as the write, so a retried batch replays the stored
+# outcome instead of writing twice. A mutation may declare a `client_id`
+# (the temporary id the app gave the record it creates); any later argument
+# whose value is that id is replaced by the server name, including ids from
+# earlier batches.
+MUTATION_HANDLERS = {
+    # called directly, see _apply
+    "save_ticket": None,
+    "add_comment": "quantbit_helpdesk.mobile_env.app.add_comment",
+    "create_employee_log": "quantbit_helpdesk.mobile_env.app.create_employee_log",
+    "create_visit": "quantbit_helpdesk.mobile_env.visit.create_visit",
+    "book_expense": "quantbit_helpdesk.mobile_env.app.book_expense",
+}
+MAX_MUTATIONS = 200
+MUTATION_RETENTION_DAYS = 30
+
+
+def _mutation_name(user, key):
+    return hashlib.md5(f"{user}\n{key}".encode(), usedforsecurity=False).hexdigest()
+
+
+def _resolve(value, id_map):
+    """Replace temporary client ids anywhere in `value` with server names."""
+    if isinstance(value, str):
+        return id_map.get(value, value)
+    if isinstance(value, list):
+        return [_resolve(v, id_map) for v in value]
+    if isinstance(value, dict):
+        return {k: _resolve(v, id_map) for k, v in value.items()}
+    return value
+
+
+def _strings(value):
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, list):
+        for v in value:
+            yield from _strings(v)
+    elif isinstance(value, dict):
+        for v in value.values():
+            yield from _strings(v)
+
+
+def _unresolved(value, failed):
+    if isinstance(value, str):
+        return value in failed
+    if isinstance(value, list):
+        return any(_unresolved(v, failed) for v in value)
+    if isinstance(value, dict):
+        return any(_unresolved(v, failed) for v in value.values())
+    return False
+
+
+def _call_gen_response_handler(method, args):
+    """Run an endpoint that reports through gen_response and capture what it wrote."""
+    response = frappe.local.response
+    frappe.local.response = frappe._dict()
+    try:
+        frappe.get_attr(method)(**args)
+        captured = frappe.local.response
+    finally:
+        frappe.local.response = response
+
+    code = cint(captured.get("http_status_code")) or 200
+    data = captured.get("data")
+    if isinstance(data, Document):
+        data = data.as_dict()
+    return {
+        "status": "success" if code < 400 else "error",
+        "code": code,
+        "message": captured.get("message"),
+        "server_name": data.get("name") if isinstance(data, dict) else None,
+    }
+
+
+def _apply(mutation_type, args):
+    if mutation_type == "save_ticket":
+        result = apply_save_ticket(args)
+        return {
+            "status": result["status"],
+            "code": result["code"],
+            "message": result["message"],
+            "server_name": result.get("ticket_name"),
+            "data": {"assigned_to": result.get("assigned_to")} if result.get("ticket_name") else None,
+        }
+    return _call_gen_response_handler(MUTATION_HANDLERS[mutation_type], args)
+
+
+def _record(user, key, mutation_type, client_id, outcome):
+    timestamp = now()
+    frappe.db.sql(
+        """
+        insert into `tabMobile Mutation`
+            (name, creation, modified, owner, modified_by, docstatus, idx,
+            user, idempotency_key, mutation_type, client_id, server_name, outcome)
+        values (%s, %s, %s, %s, %s, 0, 0, %s, %s, %s, %s, %s, %s)
+        """,
+        (
+            _mutation_name(user, key), timestamp, timestamp, user, user,
+            user, key, mutation_type, client_id, outcome.get("server_name"),
+            json.dumps(outcome, default=str),
+        ),
+    )
+
+
+@frappe.whitelist()
+def sync_mutations(mutations=None):
+    """
+    Apply an ordered batch of offline mutations.
+
+    Each item: {"key": idempotency key, "type": one of MUTATION_HANDLERS,
+    "args": {...}, "client_id": optional temporary id}. Returns one outcome
+    per item, in order, with status success / error / replayed.
+    """
+    try:
+        if mutations is None and frappe.request and frappe.request.data:
+            mutations = json.loads(frappe.request.data).get("mutations")
+        if isinstance(mutations, str):
+            mutations = json.loads(mutations)
+        if not isinstance(mutations, list) or not mutations:
+            return {"status": "error", "code": 400, "message": "mutations must be a non-empty list."}
+        if len(mutations) > MAX_MUTATIONS:
+            return {
+                "status": "error",
+                "code": 413,
+                "message": f"At most {MAX_MUTATIONS} mutations per call.",
+            }
+
+        user = frappe.session.user
+        keys = [cstr(m.get("key")) for m in mutations if isinstance(m, dict) and m.get("key")]
+        replayed = {}
+        if keys:
+            for row in frappe.get_all(
+                "Mobile Mutation",
+                filters={"name": ["in", [_mutation_name(user, k) for k in keys]]},
+                fields=["idempotency_key", "outcome"],
+            ):
+                replayed[row.idempotency_key] = row
+
+        # temporary ids created by this or earlier batches; one lookup for
+        # every string argument in the batch
+        id_map = {}
+        candidates = {v for m in mutations if isinstance(m, dict) for v in _strings(m.get("args"))}
+        if candidates:
+            for row in frappe.get_all(
+                "Mobile Mutation",
+                filters={"user": user, "client_id": ["in", list(candidates)], "server_name": ["is", "set"]},
+                fields=["client_id", "server_name"],
+            ):
+                id_map[row.client_id] = row.server_name
+        failed_ids = set()
+
+        results = []
+        for index, mutation in enumerate(mutations):
+            if not isinstance(mutation, dict):
+                results.append({"index": index, "status": "error", "code": 400, "message": "Invalid mutation."})
+                continue
+
+            key, mutation_type = cstr(mutation.get("key")), mutation.get("type")
+            client_id = mutation.get("client_id")
+            base = {"index": index, "key": key, "type": mutation_type, "client_id": client_id}
+
+            if key in replayed:
+                results.append({**base, **json.loads(replayed[key].outcome), "status": "replayed"})
+                continue
+            if not key:
+                results.append({**base, "status": "error", "code": 400, "message": "key is required."})
+                continue
+            if mutation_type not in MUTATION_HANDLERS:
+                results.append(
+                    {**base, "status": "error", "code": 400, "message": f"Unknown mutation type {mutation_type}."}
+                )
+                continue
+
+            args = mutation.get("args") or {}
+            if _unresolved(args, failed_ids):
+                if client_id:
+                    failed_ids.add(client_id)
+                results.append(
+                    {**base, "status": "error", "code": 424, "message": "Depends on a mutation that failed."}
+                )
+                continue
+            args = _resolve(args, id_map)
+
+            savepoint = f"mutation_{index}"
+            frappe.db.savepoint(savepoint)
+            try:
+                outcome = _apply(mutation_type, args)
+                if outcome["status"] == "success":
+                    _record(user, key, mutation_type, client_id, outcome)
+                else:
+                    frappe.db.rollback(save_point=savepoint)
+            except Exception as e:
+                frappe.db.rollback(save_point=savepoint)
+                code, message = _ticket_error(e)
+                if code == 500:
+                    frappe.log_error(frappe.get_traceback(), "Error in sync_mutations")
+                outcome = {"status": "error", "code": code, "message": message}
+
+            if outcome["status"] == "success":
+                replayed[key] = frappe._dict(idempotency_key=key, outcome=json.dumps(outcome, default=str))
+                if client_id and outcome.get("server_name"):
+                    id_map[client_id] = outcome["server_name"]
+            elif client_id:
+                failed_ids.add(client_id)
+            results.append({**base, **outcome})
+
+        frappe.db.commit()
+        return {"status": "success", "code": 200, "data": results}
+
+    except Exception as e:
+        frappe.log_error(frappe.get_traceback(), "Error in sync_mutations")
+        return {"status": "error", "code": 500, "message": str(e)}
+
+
+def remove_old_mutations():
+    """Daily: forget idempotency keys older than MUTATION_RETENTION_DAYS."""
+    frappe.db.delete(
+        "Mobile Mutation", {"creation": ["<", add_days(now(), -MUTATION_RETENTION_DAYS)]}
+    )
@@ -3,7 +3,7 @@ import frappe
 from frappe import _
 
 from erpnext.accounts.utils import getdate
-from mobile.mobile_env.app_utils import (
+from quantbit_helpdesk.mobile_env.app_utils import (
     gen_response,
     ess_validate,
     get_ess_settings,
@@ -11,6 +11,8 @@ from mobile.mobile_env.app_utils import (
     get_global_defaults,
     exception_handel,
 )
+from quantbit_helpdesk.mobile_env.http import fast_response
+from quantbit_helpdesk.mobile_env.thumbnails import get_thumbnail_url
 from erpnext.accounts.party import get_dashboard_info
 
 
@@ -47,6 +49,7 @@ def get_warehouselist():
 
 
 @frappe.whitelist()
+@fast_response
 def get_item_list(warehouse=None):
     
     try:
@@ -67,7 +70,7 @@ def get_items_data(items,warehouse):
             "name": item.name,
             "item_name": item.item_name,
             "item_code": item.item_code,
-            "image": item.image,
+            "image": get_thumbnail_url(item.image),
             "actual_qty": float(get_actual_qty(item.item_code,warehouse)),
             "rate": get_item_rate(item.item_code)  # Fetch rate
         }
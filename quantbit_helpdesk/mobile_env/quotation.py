@@ -2,7 +2,7 @@ import json
 import frappe
 from frappe import _
 from erpnext.accounts.utils import getdate
-from mobile.mobile_env.app_utils import (
+from quantbit_helpdesk.mobile_env.app_utils import (
     gen_response,
     ess_validate,
     get_ess_settings,
@@ -10,6 +10,8 @@ from mobile.mobile_env.app_utils import (
     get_global_defaults,
     exception_handel,
 )
+from quantbit_helpdesk.mobile_env.http import fast_response
+from quantbit_helpdesk.mobile_env.thumbnails import get_thumbnail_url
 from erpnext.accounts.party import get_dashboard_info
 
 
@@ -31,6 +33,7 @@ def get_customer_list():
 
 
 @frappe.whitelist()
+@fast_response
 def get_item_list():
     try:
         item_list = frappe.get_list(
@@ -50,7 +53,7 @@ def get_items_data(items):
             "name": item.name,
             "item_name": item.item_name,
             "item_code": item.item_code,
-            "image": item.image,
+            "image": get_thumbnail_url(item.image),
             "actual_qty": float(get_actual_qty(item.item_code)),
             "rate": get_item_rate(item.item_code)  # Fetch rate
         }
@@ -0,0 +1,196 @@
+import json
+from functools import partial
+
+import frappe
+from frappe.utils import cint
+
+# Ticket change push over Socket.IO.
+#
+# HD Ticket, Communication and ToDo (assignment) events turn into compact
+# change events that are published, once the transaction commits, to the
+# user rooms of the ticket's assignees and of the active agents of its
+# team. Every event gets a number from a global Redis counter and is kept
+# in a capped sorted set, so a client that reconnects asks
+# get_ticket_events for everything after the last number it saw instead of
+# re-polling get_hd_tickets; if it fell further behind than the log reaches
+# it is told to resync through changes_since.
+EVENT_NAME = "helpdesk_ticket_change"
+EVENT_SEQUENCE_KEY = "quantbit_helpdesk:ticket_event_seq"
+EVENT_LOG_KEY = "quantbit_helpdesk:ticket_event_log"
+EVENT_LOG_SIZE = 5000
+TEAM_MEMBERS_KEY = "quantbit_helpdesk:team_members"
+TICKET_EVENT_FIELDS = ("subject", "status", "priority", "agent_group", "modified")
+COMMUNICATION_EVENT_FIELDS = ("communication_type", "sender", "creation")
+
+# numbering and logging happen in one script so the log never holds seq N+1
+# without N; members are "<seq>:<json>" so identical payloads stay distinct
+LOG_EVENT = """
+local seq = redis.call('INCR', KEYS[1])
+redis.call('ZADD', KEYS[2], seq, seq .. ':' .. ARGV[1])
+redis.call('ZREMRANGEBYRANK', KEYS[2], 0, -tonumber(ARGV[2]) - 1)
+return seq
+"""
+
+# current seq, score of the oldest logged event (false if none) and the
+# entries after ARGV[1], read as one consistent snapshot
+READ_EVENTS = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local oldest = redis.call('ZRANGE', KEYS[2], 0, 0, 'WITHSCORES')
+local entries = redis.call('ZRANGEBYSCORE', KEYS[2], '(' .. ARGV[1], '+inf', 'LIMIT', 0, ARGV[2])
+return {current, oldest[2] or false, entries}
+"""
+
+
+def _team_members(team):
+    def get_members():
+        users = frappe.get_all(
+            "HD Team Item", filters={"parent": team, "parenttype": "HD Team"}, pluck="user"
+        )
+        if not users:
+            return []
+        return frappe.get_all("HD Agent", filters={"name": ["in", users], "is_active": 1}, pluck="name")
+
+    if not team:
+        return []
+    return frappe.cache().hget(TEAM_MEMBERS_KEY, team, generator=get_members) or []
+
+
+def _audience(assign, team, *extra):
+    users = set(json.loads(assign or "[]")) if isinstance(assign, str) else set(assign or [])
+    users.update(_team_members(team))
+    users.update(u for u in extra if u)
+    return sorted(users)
+
+
+def _emit(event, audience):
+    cache = frappe.cache()
+    seq = cache.register_script(LOG_EVENT)(
+        keys=[cache.make_key(EVENT_SEQUENCE_KEY), cache.make_key(EVENT_LOG_KEY)],
+        args=[json.dumps({"event": event, "audience": audience}, default=str), EVENT_LOG_SIZE],
+    )
+    event = {**event, "seq": int(seq)}
+    for user in audience:
+        frappe.publish_realtime(EVENT_NAME, event, user=user)
+
+
+def _queue_event(event, audience):
+    """Number, log and publish `event` only if the current transaction commits."""
+    if audience:
+        frappe.db.after_commit.add(partial(_emit, event, audience))
+
+
+def publish_ticket_change(doc, method=None):
+    """HD Ticket on_change"""
+    before = doc.get_doc_before_save()
+    if before and all(before.get(f) == doc.get(f) for f in TICKET_EVENT_FIELDS if f != "modified"):
+        return
+
+    previous_team = before.agent_group if before and before.agent_group != doc.agent_group else None
+    _queue_event(
+        {
+            "doctype": "HD Ticket",
+            "name": doc.name,
+            "ticket": doc.name,
+            "action": "update" if before else "insert",
+            "fields": {f: doc.get(f) for f in TICKET_EVENT_FIELDS},
+        },
+        # members of the team the ticket left have to drop it too
+        _audience(doc.get("_assign"), doc.agent_group, *_team_members(previous_team)),
+    )
+
+
+def publish_ticket_delete(doc, method=None):
+    """HD Ticket on_trash"""
+    _queue_event(
+        {"doctype": "HD Ticket", "name": doc.name, "ticket": doc.name, "action": "delete", "fields": {}},
+        _audience(doc.get("_assign"), doc.agent_group),
+    )
+
+
+def publish_communication(doc, method=None):
+    """Communication after_insert"""
+    if doc.reference_doctype != "HD Ticket" or not doc.reference_name:
+        return
+    ticket = frappe.db.get_value("HD Ticket", doc.reference_name, ["_assign", "agent_group"], as_dict=True)
+    if not ticket:
+        return
+    _queue_event(
+        {
+            "doctype": "Communication",
+            "name": doc.name,
+            "ticket": doc.reference_name,
+            "action": "insert",
+            "fields": {f: doc.get(f) for f in COMMUNICATION_EVENT_FIELDS},
+        },
+        _audience(ticket._assign, ticket.agent_group),
+    )
+
+
+def publish_assignment(doc, method=None):
+    """ToDo after_insert / on_update: _assign is written without HD Ticket events."""
+    if doc.reference_type != "HD Ticket" or not doc.reference_name:
+        return
+    if method == "on_update" and not doc.has_value_changed("status"):
+        return
+    ticket = frappe.db.get_value(
+        "HD Ticket", doc.reference_name, ["name", "_assign", *TICKET_EVENT_FIELDS], as_dict=True
+    )
+    if not ticket:
+        return
+    _queue_event(
+        {
+            "doctype": "HD Ticket",
+            "name": ticket.name,
+            "ticket": ticket.name,
+            "action": "assignment",
+            "fields": {
+                **{f: ticket.get(f) for f in TICKET_EVENT_FIELDS},
+                "allocated_to": doc.allocated_to,
+                "assignment_status": doc.status,
+            },
+        },
+        _audience(ticket._assign, ticket.agent_group, doc.allocated_to),
+    )
+
+
+def clear_team_members(doc=None, method=None, *args, **kwargs):
+    """HD Team / HD Agent change"""
+    frappe.cache().delete_value(TEAM_MEMBERS_KEY)
+
+
+@frappe.whitelist()
+def get_ticket_events(since=0, limit=500):
+    """
+    Events numbered after `since` that were sent to the current user,
+    oldest first. Resume with `last_seq`; `reset` means events were already
+    dropped from the log and the client has to resync via changes_since.
+    """
+    cache = frappe.cache()
+    since, limit = cint(since), min(cint(limit) or 500, EVENT_LOG_SIZE)
+    current_seq, oldest, entries = cache.register_script(READ_EVENTS)(
+        keys=[cache.make_key(EVENT_SEQUENCE_KEY), cache.make_key(EVENT_LOG_KEY)],
+        args=[since, limit],
+    )
+    current_seq = cint(current_seq)
+    reset = bool(since) and since < current_seq and (not oldest or cint(oldest) > since + 1)
+
+    user = frappe.session.user
+    sees_all = "System Manager" in frappe.get_roles(user)
+    events, last_seq = [], None
+    for entry in entries:
+        seq, _, payload = (entry.decode() if isinstance(entry, bytes) else entry).partition(":")
+        last_seq = int(seq)
+        payload = json.loads(payload)
+        if sees_all or user in payload["audience"]:
+            events.append({**payload["event"], "seq": last_seq})
+
+    return {
+        "status": "success",
+        "code": 200,
+        "data": {
+            "events": events,
+            "last_seq": last_seq if entries else max(since, current_seq),
+            "has_more": len(entries) == limit,
+            "reset": reset,
+        },
+    }
@@ -0,0 +1,361 @@
+import hashlib
+import json
+import os
+import re
+
+import frappe
+from frappe.utils import cint
+from frappe.utils.synchronization import filelock
+
+from quantbit_helpdesk.mobile_env.app_utils import html_to_text
+
+# "Similar resolved tickets" from per-module TF-IDF indexes.
+#
+# Resolved tickets are grouped by (custom_module, custom_sub_module). Each
+# group is one .npz file under private/similar_tickets holding a sparse
+# term-count matrix (one row per ticket) together with its JSON metadata:
+# the vocabulary, per-term document frequencies and the ticket of every
+# row. Keeping both in one file that is swapped in with a rename means a
+# reader never pairs a new matrix with old metadata. Counts rather
+# than weights are kept so a ticket can be appended or dropped without
+# touching the other rows; IDF weighting and row normalisation happen once
+# when a worker loads the group, after which a query is one sparse
+# matrix-vector product against the precomputed matrix. Only the ticket
+# being looked up is tokenized per request.
+RESOLVED_STATUSES = ("Resolved", "Closed")
+INDEX_FOLDER = "similar_tickets"
+MIN_SIMILARITY = 0.1
+DEFAULT_LIMIT = 5
+REBUILD_PAGE_LENGTH = 500
+
+_TOKEN = re.compile(r"[^\W\d_]{2,}")
+
+# (site, group key) -> (mtime, loaded index), per worker process
+_loaded_indexes = {}
+
+
+def _tokens(text):
+    return _TOKEN.findall(text.lower())
+
+
+def _group_key(module, sub_module):
+    return hashlib.md5(f"{module or ''}\n{sub_module or ''}".encode(), usedforsecurity=False).hexdigest()
+
+
+def _index_folder():
+    folder = frappe.get_site_path("private", INDEX_FOLDER)
+    os.makedirs(folder, exist_ok=True)
+    return folder
+
+
+def _index_path(key):
+    return os.path.join(_index_folder(), f"{key}.npz")
+
+
+def _ticket_texts(tickets):
+    """{ticket name: subject + description + communications} for ticket rows."""
+    if not tickets:
+        return {}
+    texts = {str(t.name): [t.subject or "", html_to_text(t.description)] for t in tickets}
+    for communication in frappe.get_all(
+        "Communication",
+        filters={"reference_doctype": "HD Ticket", "reference_name": ["in", list(texts)]},
+        fields=["reference_name", "content"],
+        order_by="creation asc",
+    ):
+        texts[str(communication.reference_name)].append(html_to_text(communication.content))
+    return {name: " ".join(parts) for name, parts in texts.items()}
+
+
+def _read_index(key):
+    import numpy as np
+    from scipy import sparse
+
+    path = _index_path(key)
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as stored:
+        counts = sparse.csr_matrix(
+            (stored["data"], stored["indices"], stored["indptr"]), shape=tuple(stored["shape"])
+        )
+        meta = json.loads(str(stored["meta"]))
+    return counts, meta
+
+
+def _write_index(key, counts, meta):
+    import numpy as np
+
+    path = _index_path(key)
+    if not meta["tickets"]:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+
+    # write-then-rename so readers never see half a file
+    counts = counts.tocsr()
+    np.savez_compressed(
+        path + ".tmp.npz",
+        data=counts.data,
+        indices=counts.indices,
+        indptr=counts.indptr,
+        shape=np.array(counts.shape),
+        meta=np.array(json.dumps(meta)),
+    )
+    os.replace(path + ".tmp.npz", path)
+
+
+def _count_rows(texts, vocabulary):
+    """Term-count rows for `texts`, growing `vocabulary` with unseen terms."""
+    import numpy as np
+    from scipy import sparse
+
+    indptr, indices, data = [0], [], []
+    for text in texts:
+        row = {}
+        for token in _tokens(text):
+            column = vocabulary.setdefault(token, len(vocabulary))
+            row[column] = row.get(column, 0) + 1
+        indices.extend(row)
+        data.extend(row.values())
+        indptr.append(len(indices))
+    return sparse.csr_matrix(
+        (np.array(data, dtype=np.float32), np.array(indices, dtype=np.int32), np.array(indptr)),
+        shape=(len(texts), len(vocabulary)),
+    )
+
+
+def _update_group(key, module, sub_module, add=None, remove=()):
+    """Drop the `remove` tickets from a group and append/replace the `add` ones."""
+    import numpy as np
+    from scipy import sparse
+
+    add = add or {}
+    with filelock(f"similar_tickets_{key}"):
+        existing = _read_index(key)
+        if existing:
+            counts, meta = existing
+        else:
+            counts = sparse.csr_matrix((0, 0), dtype=np.float32)
+            meta = {"module": module, "sub_module": sub_module, "vocabulary": {}, "tickets": []}
+
+        drop = set(remove) | set(add)
+        keep = [i for i, ticket in enumerate(meta["tickets"]) if ticket not in drop]
+        if len(keep) == len(meta["tickets"]) and not add:
+            return
+
+        vocabulary = meta["vocabulary"]
+        new_rows = _count_rows(list(add.values()), vocabulary)
+        counts = counts[keep]
+        counts.resize((counts.shape[0], len(vocabulary)))
+        counts = sparse.vstack([counts, new_rows], format="csr")
+
+        meta["tickets"] = [meta["tickets"][i] for i in keep] + list(add)
+        meta["document_frequency"] = np.diff(counts.tocsc().indptr).tolist()
+        _write_index(key, counts, meta)
+
+
+def _load_index(key):
+    """IDF-weighted, L2-normalised matrix of a group, cached per process."""
+    import numpy as np
+    from scipy import sparse
+
+    path = _index_path(key)
+    if not os.path.exists(path):
+        _loaded_indexes.pop((frappe.local.site, key), None)
+        return None
+    mtime = os.path.getmtime(path)
+    cached = _loaded_indexes.get((frappe.local.site, key))
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    counts, meta = _read_index(key)
+    n_docs = counts.shape[0]
+    df = np.asarray(meta["document_frequency"], dtype=np.float32)
+    idf = np.log((1 + n_docs) / (1 + df)) + 1
+    weights = counts.multiply(idf).tocsr()
+    norms = np.sqrt(np.asarray(weights.multiply(weights).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    weights = sparse.diags(1 / norms).dot(weights).tocsr()
+
+    index = frappe._dict(
+        weights=weights, idf=idf, vocabulary=meta["vocabulary"], tickets=meta["tickets"]
+    )
+    _loaded_indexes[(frappe.local.site, key)] = (mtime, index)
+    return index
+
+
+def _query(index, text, limit, exclude=None):
+    import numpy as np
+
+    vector = np.zeros(len(index.vocabulary), dtype=np.float32)
+    for token in _tokens(text):
+        column = index.vocabulary.get(token)
+        if column is not None:
+            vector[column] += 1
+    vector *= index.idf
+    norm = np.linalg.norm(vector)
+    if not norm:
+        return []
+
+    scores = index.weights.dot(vector / norm)
+    if exclude in index.tickets:
+        scores[index.tickets.index(exclude)] = 0
+    top = min(limit, len(scores))
+    candidates = np.argpartition(-scores, top - 1)[:top]
+    candidates = candidates[np.argsort(-scores[candidates])]
+    return [
+        (index.tickets[i], float(scores[i])) for i in candidates if scores[i] >= MIN_SIMILARITY
+    ]
+
+
+def update_similar_ticket_index(ticket, previous_group=None):
+    """Background job: bring one ticket's rows in line with its current state."""
+    doc = frappe.db.get_value(
+        "HD Ticket",
+        ticket,
+        ["name", "subject", "description", "status", "custom_module", "custom_sub_module"],
+        as_dict=True,
+    )
+    current_group = None
+    if doc and doc.status in RESOLVED_STATUSES:
+        current_group = (doc.custom_module, doc.custom_sub_module)
+        key = _group_key(*current_group)
+        _update_group(key, *current_group, add=_ticket_texts([doc]))
+
+    if previous_group and tuple(previous_group) != current_group:
+        _update_group(_group_key(*previous_group), *previous_group, remove=[str(ticket)])
+
+
+def queue_similar_ticket_index(doc, method=None):
+    """HD Ticket on_change: index on resolution, drop on reopen or module change."""
+    before = doc.get_doc_before_save()
+    is_resolved = doc.status in RESOLVED_STATUSES
+    was_resolved = bool(before) and before.status in RESOLVED_STATUSES
+    if not is_resolved and not was_resolved:
+        return
+
+    previous_group = None
+    if was_resolved:
+        previous_group = (before.custom_module, before.custom_sub_module)
+        if is_resolved and previous_group == (doc.custom_module, doc.custom_sub_module):
+            return
+
+    frappe.enqueue(
+        "quantbit_helpdesk.mobile_env.similar_tickets.update_similar_ticket_index",
+        queue="short",
+        ticket=str(doc.name),
+        previous_group=previous_group,
+        enqueue_after_commit=True,
+    )
+
+
+def remove_from_similar_ticket_index(doc, method=None):
+    """HD Ticket on_trash"""
+    if doc.status not in RESOLVED_STATUSES:
+        return
+    frappe.enqueue(
+        "quantbit_helpdesk.mobile_env.similar_tickets.update_similar_ticket_index",
+        queue="short",
+        ticket=str(doc.name),
+        previous_group=(doc.custom_module, doc.custom_sub_module),
+        enqueue_after_commit=True,
+    )
+
+
+def remove_tickets_from_similar_ticket_indexes(tickets):
+    """Drop resolved ticket rows (dicts with name, status and module fields) in one pass per group."""
+    groups = {}
+    for ticket in tickets:
+        if ticket.get("status") in RESOLVED_STATUSES:
+            group = (ticket.get("custom_module"), ticket.get("custom_sub_module"))
+            groups.setdefault(group, []).append(str(ticket.get("name")))
+    for group, names in groups.items():
+        _update_group(_group_key(*group), *group, remove=names)
+
+
+def rebuild_similar_ticket_indexes():
+    """
+    Weekly: rebuild every group from scratch, which also picks up
+    communications added after resolution and compacts the vocabularies.
+    """
+    groups = {}
+    last_name = None
+    while True:
+        filters = [["status", "in", RESOLVED_STATUSES]]
+        if last_name:
+            filters.append(["name", ">", last_name])
+        tickets = frappe.get_all(
+            "HD Ticket",
+            filters=filters,
+            fields=["name", "subject", "description", "custom_module", "custom_sub_module"],
+            order_by="name asc",
+            limit_page_length=REBUILD_PAGE_LENGTH,
+        )
+        if not tickets:
+            break
+        texts = _ticket_texts(tickets)
+        for ticket in tickets:
+            group = groups.setdefault((ticket.custom_module, ticket.custom_sub_module), {})
+            group[str(ticket.name)] = texts[str(ticket.name)]
+        last_name = tickets[-1].name
+
+    import numpy as np
+
+    keys = set()
+    for (module, sub_module), texts in groups.items():
+        key = _group_key(module, sub_module)
+        keys.add(key)
+        with filelock(f"similar_tickets_{key}"):
+            vocabulary = {}
+            counts = _count_rows(list(texts.values()), vocabulary)
+            meta = {
+                "module": module,
+                "sub_module": sub_module,
+                "vocabulary": vocabulary,
+                "tickets": list(texts),
+                "document_frequency": np.diff(counts.tocsc().indptr).tolist(),
+            }
+            _write_index(key, counts, meta)
+
+    folder = _index_folder()
+    for file_name in os.listdir(folder):
+        if file_name.split(".")[0] not in keys:
+            os.remove(os.path.join(folder, file_name))
+
+
+@frappe.whitelist()
+def get_similar_tickets(name, limit=DEFAULT_LIMIT):
+    """Most similar resolved tickets in the same module / sub module as `name`."""
+    try:
+        ticket = frappe.get_doc("HD Ticket", name)
+        ticket.check_permission("read")
+
+        index = _load_index(_group_key(ticket.custom_module, ticket.custom_sub_module))
+        if not index:
+            return {"status": "success", "code": 200, "data": []}
+
+        text = _ticket_texts([ticket])[str(ticket.name)]
+        matches = _query(index, text, cint(limit) or DEFAULT_LIMIT, exclude=str(ticket.name))
+        if not matches:
+            return {"status": "success", "code": 200, "data": []}
+
+        details = {
+            str(t.name): t
+            for t in frappe.get_all(
+                "HD Ticket",
+                filters={"name": ["in", [m[0] for m in matches]]},
+                fields=["name", "subject", "status", "resolution_date"],
+            )
+        }
+        data = [
+            {**details[match], "similarity": round(score, 3)}
+            for match, score in matches
+            if match in details
+        ]
+        return {"status": "success", "code": 200, "data": data}
+
+    except frappe.DoesNotExistError:
+        return {"status": "error", "code": 404, "message": f"Ticket with name {name} does not exist."}
+    except Exception as e:
+        frappe.log_error(frappe.get_traceback(), "Error in get_similar_tickets")
+        return {"status": "error", "code": 500, "message": str(e)}
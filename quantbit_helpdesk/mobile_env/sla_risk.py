@@ -0,0 +1,196 @@
+import frappe
+from frappe.utils import add_to_date, cint, get_datetime, now, now_datetime
+
+# One `SLA Risk Entry` per pending deadline of an active ticket: "Response"
+# until the first response, "Resolution" until the ticket is resolved. Rows
+# are indexed on (agent_group, priority, deadline), so "what breaches next in
+# this team/priority" is a range read instead of date arithmetic over every
+# open ticket. Paused tickets drop out because their SLA clock is on hold.
+#
+# Rows follow HD Ticket events; the hourly refresh re-syncs only tickets
+# modified since its previous run, which catches writes made without
+# document events. The full rebuild is a repair tool
+# (`bench rebuild-sla-risk-queue`).
+QUEUED_STATUSES = ("Open", "Replied")
+DEADLINE_FIELDS = {"Response": "response_by", "Resolution": "resolution_by"}
+TICKET_FIELDS = (
+    "name", "status", "response_by", "resolution_by", "first_responded_on", "agent_group", "priority"
+)
+WATERMARK_KEY = "quantbit_helpdesk_sla_risk_watermark"
+REFRESH_PAGE_LENGTH = 1000
+
+
+def _pending_deadlines(ticket):
+    """{deadline_type: deadline} that should be queued for this ticket."""
+    if ticket.get("status") not in QUEUED_STATUSES:
+        return {}
+    pending = {}
+    if ticket.get("response_by") and not ticket.get("first_responded_on"):
+        pending["Response"] = ticket.get("response_by")
+    if ticket.get("resolution_by"):
+        pending["Resolution"] = ticket.get("resolution_by")
+    return pending
+
+
+def sync_sla_risk_entries(doc, method=None):
+    """HD Ticket on_change: upsert or drop this ticket's queue rows."""
+    _sync_ticket(doc)
+
+
+def _sync_ticket(doc):
+    pending = _pending_deadlines(doc)
+    stale = [t for t in DEADLINE_FIELDS if t not in pending]
+    if stale:
+        frappe.db.delete(
+            "SLA Risk Entry", {"name": ["in", [f"{doc.name}-{t}" for t in stale]]}
+        )
+
+    timestamp, user = now(), frappe.session.user
+    for deadline_type, deadline in pending.items():
+        frappe.db.sql(
+            """
+            insert into `tabSLA Risk Entry`
+                (name, creation, modified, owner, modified_by, docstatus, idx,
+                ticket, deadline_type, deadline, agent_group, priority)
+            values (%s, %s, %s, %s, %s, 0, 0, %s, %s, %s, %s, %s)
+            on duplicate key update
+                modified = values(modified), deadline = values(deadline),
+                agent_group = values(agent_group), priority = values(priority)
+            """,
+            (
+                f"{doc.name}-{deadline_type}", timestamp, timestamp, user, user,
+                doc.name, deadline_type, get_datetime(deadline), doc.agent_group, doc.priority,
+            ),
+        )
+
+
+def remove_sla_risk_entries(doc, method=None):
+    """HD Ticket on_trash"""
+    frappe.db.delete("SLA Risk Entry", {"ticket": doc.name})
+
+
+def refresh_sla_risk_entries():
+    """
+    Hourly: re-sync the tickets modified since the previous run, so changes
+    made without document events (bulk SQL, imports) are picked up, and
+    drop rows whose ticket no longer exists.
+    """
+    started = now()
+    since = frappe.db.get_global(WATERMARK_KEY)
+    last = None
+    while True:
+        filters = [["modified", ">", since]] if since else []
+        if last:
+            # (modified, name) keyset paging; rows saved meanwhile come after
+            filters.append(["modified", ">=", last.modified])
+        tickets = frappe.get_all(
+            "HD Ticket",
+            filters=filters,
+            or_filters=[["modified", ">", last.modified], ["name", ">", last.name]] if last else None,
+            fields=[*TICKET_FIELDS, "modified"],
+            order_by="modified asc, name asc",
+            limit_page_length=REFRESH_PAGE_LENGTH,
+        )
+        if not tickets:
+            break
+        for ticket in tickets:
+            _sync_ticket(ticket)
+        frappe.db.commit()
+        last = tickets[-1]
+
+    frappe.db.sql(
+        """
+        delete entry from `tabSLA Risk Entry` entry
+        left join `tabHD Ticket` ticket on ticket.name = entry.ticket
+        where ticket.name is null
+        """
+    )
+    frappe.db.set_global(WATERMARK_KEY, started)
+
+
+def rebuild_sla_risk_queue():
+    """
+    Repair: rebuild the whole queue from the active tickets. Empties the
+    table first, so run it from `bench rebuild-sla-risk-queue`, not on a
+    schedule. Sets the refresh watermark, so the next hourly run only
+    looks at tickets changed after this rebuild started.
+    """
+    started = now()
+    frappe.db.delete("SLA Risk Entry")
+    statuses = ", ".join(frappe.db.escape(s) for s in QUEUED_STATUSES)
+    values = {"now": started, "user": "Administrator"}
+    frappe.db.sql(
+        f"""
+        insert into `tabSLA Risk Entry`
+            (name, creation, modified, owner, modified_by, docstatus, idx,
+            ticket, deadline_type, deadline, agent_group, priority)
+        select concat(name, '-Response'), %(now)s, %(now)s, %(user)s, %(user)s, 0, 0,
+            name, 'Response', response_by, agent_group, priority
+        from `tabHD Ticket`
+        where status in ({statuses}) and response_by is not null and first_responded_on is null
+        """,
+        values,
+    )
+    frappe.db.sql(
+        f"""
+        insert into `tabSLA Risk Entry`
+            (name, creation, modified, owner, modified_by, docstatus, idx,
+            ticket, deadline_type, deadline, agent_group, priority)
+        select concat(name, '-Resolution'), %(now)s, %(now)s, %(user)s, %(user)s, 0, 0,
+            name, 'Resolution', resolution_by, agent_group, priority
+        from `tabHD Ticket`
+        where status in ({statuses}) and resolution_by is not null
+        """,
+        values,
+    )
+    frappe.db.set_global(WATERMARK_KEY, started)
+
+
+@frappe.whitelist()
+def get_at_risk_tickets(team=None, priority=None, deadline_type=None, within_minutes=60, limit=50):
+    """
+    Tickets whose SLA deadline falls within the next `within_minutes`
+    (already breached ones included), earliest deadline first.
+    """
+    try:
+        horizon = add_to_date(now_datetime(), minutes=cint(within_minutes))
+        filters = {"deadline": ["<=", horizon]}
+        if team:
+            filters["agent_group"] = team
+        if priority:
+            filters["priority"] = priority
+        if deadline_type:
+            filters["deadline_type"] = deadline_type
+
+        entries = frappe.get_all(
+            "SLA Risk Entry",
+            filters=filters,
+            fields=["ticket", "deadline_type", "deadline", "agent_group", "priority"],
+            order_by="deadline asc",
+            limit_page_length=cint(limit) or 50,
+        )
+
+        subjects = {}
+        if entries:
+            subjects = {
+                str(t.name): t
+                for t in frappe.get_all(
+                    "HD Ticket",
+                    filters={"name": ["in", list({e.ticket for e in entries})]},
+                    fields=["name", "subject", "status", "_assign"],
+                )
+            }
+
+        current_time = now_datetime()
+        for entry in entries:
+            ticket = subjects.get(str(entry.ticket)) or {}
+            entry["subject"] = ticket.get("subject")
+            entry["status"] = ticket.get("status")
+            entry["_assign"] = ticket.get("_assign")
+            entry["breached"] = get_datetime(entry.deadline) < current_time
+
+        return {"status": "success", "code": 200, "data": entries}
+
+    except Exception as e:
+        frappe.log_error(frappe.get_traceback(), "Error in get_at_risk_tickets")
+        return {"status": "error", "code": 500, "message": str(e)}
@@ -0,0 +1,89 @@
+import csv
+import os
+import tempfile
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from quantbit_helpdesk.mobile_env.ticket_import import import_tickets
+
+TEST_PRIORITY = "_Test Import Priority"
+
+
+class TestTicketImport(FrappeTestCase):
+    def setUp(self):
+        if not frappe.db.exists("HD Ticket Priority", TEST_PRIORITY):
+            frappe.get_doc({"doctype": "HD Ticket Priority"}).insert(set_name=TEST_PRIORITY)
+        self.path = os.path.join(tempfile.mkdtemp(), "tickets.csv")
+
+    def tearDown(self):
+        os.remove(self.path)
+        # the import commits its batches, so the rows outlive the test transaction
+        frappe.db.delete("HD Ticket", {"subject": ["like", "_Test import%"]})
+        frappe.db.commit()
+
+    def write_csv(self, rows):
+        with open(self.path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+
+    def test_import_csv(self):
+        # custom_notes is mapped by save_ticket but is not an HD Ticket column
+        self.write_csv(
+            [
+                {
+                    "subject": "_Test import one",
+                    "priority": TEST_PRIORITY,
+                    "description": "<p>First imported ticket</p>",
+                    "custom_notes": "ignored",
+                },
+                {
+                    "subject": "_Test import two",
+                    "priority": TEST_PRIORITY,
+                    "description": "Second imported ticket",
+                    "custom_notes": "",
+                },
+            ]
+        )
+
+        result = import_tickets(self.path)
+
+        self.assertEqual(result["inserted"], 2)
+        self.assertEqual(result["error_count"], 0)
+        ticket = frappe.db.get_value(
+            "HD Ticket", {"subject": "_Test import one"}, ["priority", "custom_preview"], as_dict=True
+        )
+        self.assertEqual(ticket.priority, TEST_PRIORITY)
+        self.assertEqual(ticket.custom_preview, "First imported ticket")
+
+    def test_imported_names_follow_the_naming_sequence(self):
+        self.write_csv(
+            [{"subject": f"_Test import sequence {i}", "priority": TEST_PRIORITY} for i in range(3)]
+        )
+
+        self.assertEqual(import_tickets(self.path)["inserted"], 3)
+
+        names = frappe.get_all(
+            "HD Ticket", filters={"subject": ["like", "_Test import sequence%"]}, pluck="name"
+        )
+        self.assertEqual(len(set(names)), 3)
+        # a regular insert afterwards must not collide with the imported names
+        ticket = frappe.get_doc(
+            {"doctype": "HD Ticket", "subject": "_Test import after", "priority": TEST_PRIORITY}
+        ).insert()
+        self.assertNotIn(ticket.name, names)
+
+    def test_invalid_rows_are_not_imported(self):
+        self.write_csv(
+            [
+                {"subject": "_Test import valid", "priority": TEST_PRIORITY},
+                {"subject": "_Test import invalid", "priority": "_Test Missing Priority"},
+            ]
+        )
+
+        result = import_tickets(self.path)
+
+        self.assertEqual(result["inserted"], 0)
+        self.assertEqual(result["errors"][0]["row"], 2)
+        self.assertFalse(frappe.db.exists("HD Ticket", {"subject": "_Test import valid"}))
@@ -0,0 +1,108 @@
+import os
+
+import frappe
+
+# Resized copies of public images, written next to the original by a
+# background job: /files/photo.png -> /files/photo.png_thumb_128.webp. The
+# source extension stays in the name so photo.png and photo.jpg do not share
+# (and overwrite) one derivative.
+# Private files are skipped because a derivative without its own File
+# record could not be served through the permission check.
+THUMBNAIL_SIZES = {"small": 128, "medium": 512}
+THUMBNAIL_FORMAT = "webp"
+THUMBNAIL_QUALITY = 80
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".webp", ".bmp", ".tif", ".tiff")
+
+
+def _is_local_public_image(file_url):
+    return bool(
+        file_url
+        and file_url.startswith("/files/")
+        and os.path.splitext(file_url)[1].lower() in IMAGE_EXTENSIONS
+    )
+
+
+def _thumbnail_url(file_url, pixels):
+    return f"{file_url}_thumb_{pixels}.{THUMBNAIL_FORMAT}"
+
+
+def _site_path(file_url):
+    return frappe.get_site_path("public", file_url.lstrip("/"))
+
+
+def get_thumbnail_url(file_url, size="small"):
+    """Thumbnail of `file_url` if one has been generated, else `file_url` itself."""
+    if not _is_local_public_image(file_url):
+        return file_url
+    thumbnail = _thumbnail_url(file_url, THUMBNAIL_SIZES[size])
+    return thumbnail if os.path.exists(_site_path(thumbnail)) else file_url
+
+
+def get_absolute_thumbnail_url(file_url, size="small"):
+    if not file_url:
+        return None
+    url = get_thumbnail_url(file_url, size)
+    return url if url.startswith(("http://", "https://")) else frappe.utils.get_url() + url
+
+
+def generate_thumbnails(file_url):
+    """Background job: write every THUMBNAIL_SIZES derivative, EXIF stripped."""
+    from PIL import Image, ImageOps
+
+    source = _site_path(file_url)
+    if not os.path.exists(source):
+        return
+
+    with Image.open(source) as image:
+        # bake the EXIF orientation in, then drop EXIF by not passing it on save
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+
+        for pixels in THUMBNAIL_SIZES.values():
+            thumbnail = image.copy()
+            thumbnail.thumbnail((pixels, pixels), Image.Resampling.LANCZOS)
+            thumbnail.save(
+                _site_path(_thumbnail_url(file_url, pixels)),
+                THUMBNAIL_FORMAT,
+                quality=THUMBNAIL_QUALITY,
+            )
+
+
+def queue_thumbnails(doc, method=None):
+    """File after_insert: resize in a worker, never in the web request."""
+    if doc.is_folder or doc.is_private or not _is_local_public_image(doc.file_url):
+        return
+    frappe.enqueue(
+        "quantbit_helpdesk.mobile_env.thumbnails.generate_thumbnails",
+        queue="short",
+        file_url=doc.file_url,
+        enqueue_after_commit=True,
+    )
+
+
+def remove_thumbnails(doc, method=None):
+    """File on_trash"""
+    if doc.is_private or not _is_local_public_image(doc.file_url):
+        return
+    # other File records may share the same content on disk
+    if frappe.db.exists("File", {"file_url": doc.file_url, "name": ["!=", doc.name]}):
+        return
+    for pixels in THUMBNAIL_SIZES.values():
+        path = _site_path(_thumbnail_url(doc.file_url, pixels))
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def generate_missing_thumbnails():
+    """Backfill thumbnails for public images uploaded before this existed."""
+    for file_url in frappe.get_all(
+        "File", filters={"is_private": 0, "is_folder": 0}, pluck="file_url", distinct=True
+    ):
+        if not _is_local_public_image(file_url):
+            continue
+        if get_thumbnail_url(file_url, "medium") == file_url:
+            try:
+                generate_thumbnails(file_url)
+            except Exception:
+                frappe.log_error(frappe.get_traceback(), f"Thumbnail generation failed for {file_url}")
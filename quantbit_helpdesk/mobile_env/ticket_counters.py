@@ -0,0 +1,128 @@
+import frappe
+from frappe.utils import now
+
+# Public dimension name -> HD Ticket column. Every ticket adds one to the
+# `Ticket Counter` row "<dimension>:<value>" of each dimension it has a value
+# for, so a badge count is a primary-key lookup instead of a GROUP BY scan.
+COUNTER_DIMENSIONS = {
+    "status": "status",
+    "priority": "priority",
+    "department": "custom_department",
+    "module": "custom_module",
+    "team": "agent_group",
+}
+
+
+def _counted_values(doc):
+    return {dimension: doc.get(field) for dimension, field in COUNTER_DIMENSIONS.items()}
+
+
+def _apply_deltas(deltas):
+    rows = [(dimension, value, delta) for (dimension, value), delta in deltas.items() if delta]
+    if not rows:
+        return
+
+    timestamp, user = now(), frappe.session.user
+    placeholders = ", ".join(["(%s, %s, %s, %s, %s, 0, 0, %s, %s, %s)"] * len(rows))
+    values = []
+    for dimension, value, delta in rows:
+        values.extend([f"{dimension}:{value}", timestamp, timestamp, user, user, dimension, value, delta])
+
+    frappe.db.sql(
+        f"""
+        insert into `tabTicket Counter`
+            (name, creation, modified, owner, modified_by, docstatus, idx, dimension, value, ticket_count)
+        values {placeholders}
+        on duplicate key update
+            ticket_count = ticket_count + values(ticket_count), modified = values(modified)
+        """,
+        values,
+    )
+
+
+def _diff(before, after):
+    deltas = {}
+    for dimension in COUNTER_DIMENSIONS:
+        old, new = before.get(dimension), after.get(dimension)
+        if old == new:
+            continue
+        if old:
+            deltas[(dimension, old)] = deltas.get((dimension, old), 0) - 1
+        if new:
+            deltas[(dimension, new)] = deltas.get((dimension, new), 0) + 1
+    return deltas
+
+
+def snapshot_ticket_counters(doc, method=None):
+    """HD Ticket validate: remember what is currently counted for this ticket."""
+    before = doc.get_doc_before_save()
+    doc.flags.ticket_counter_snapshot = _counted_values(before) if before else {}
+
+
+def update_ticket_counters(doc, method=None):
+    """
+    HD Ticket on_change: move the ticket between counter rows.
+
+    on_change fires for inserts, saves and db_set(). The snapshot carried in
+    doc.flags makes nested db_set() calls during a save count exactly once;
+    a bare db_set() falls back to the state loaded before it ran.
+    """
+    before = doc.flags.ticket_counter_snapshot
+    if before is None:
+        previous = doc.get_doc_before_save()
+        before = _counted_values(previous) if previous else {}
+
+    after = _counted_values(doc)
+    _apply_deltas(_diff(before, after))
+    doc.flags.ticket_counter_snapshot = after
+
+
+def remove_ticket_counters(doc, method=None):
+    """HD Ticket on_trash"""
+    _apply_deltas(_diff(_counted_values(doc), {}))
+
+
+def rebuild_ticket_counters():
+    """Recount every dimension from HD Ticket (reconciliation)."""
+    frappe.db.delete("Ticket Counter")
+    for dimension, field in COUNTER_DIMENSIONS.items():
+        counts = frappe.db.sql(
+            f"""select `{field}`, count(*) from `tabHD Ticket`
+            where ifnull(`{field}`, '') != '' group by `{field}`"""
+        )
+        _apply_deltas({(dimension, value): count for value, count in counts})
+
+
+@frappe.whitelist()
+def get_ticket_counts(dimensions=None):
+    """
+    Ticket counts per value of each requested dimension, e.g.
+    dimensions="status,team" -> {"status": {"Open": 12, ...}, "team": {...}}
+    """
+    try:
+        if not dimensions:
+            dimensions = list(COUNTER_DIMENSIONS)
+        elif isinstance(dimensions, str):
+            dimensions = [d.strip() for d in dimensions.split(",") if d.strip()]
+
+        unknown = [d for d in dimensions if d not in COUNTER_DIMENSIONS]
+        if unknown:
+            return {
+                "status": "error",
+                "code": 400,
+                "message": f"Unknown dimensions: {', '.join(unknown)}",
+            }
+
+        counts = {dimension: {} for dimension in dimensions}
+        for row in frappe.get_all(
+            "Ticket Counter",
+            filters={"dimension": ["in", dimensions], "ticket_count": ["!=", 0]},
+            fields=["dimension", "value", "ticket_count"],
+        ):
+            counts[row.dimension][row.value] = row.ticket_count
+
+        return {"status": "success", "code": 200, "data": counts}
+
+    except Exception as e:
+        frappe.log_error(frappe.get_traceback(), "Error in get_ticket_counts")
+        return {"status": "error", "code": 500, "message": str(e)}
@@ -0,0 +1,259 @@
+import csv
+import json
+import os
+
+import frappe
+from frappe.model.naming import make_autoname
+from frappe.utils import cint, cstr, get_datetime, now
+
+from quantbit_helpdesk.mobile_env.app_utils import html_to_text
+from quantbit_helpdesk.mobile_env.helpdesk import (
+    MANDATORY_TICKET_FIELDS,
+    TICKET_FIELDS_TO_MAP,
+    TICKET_PREVIEW_LENGTH,
+    existing_link_values,
+    ticket_link_fields,
+)
+
+# Bulk ticket import from CSV, NDJSON or XLSX.
+#
+# The file is streamed three times instead of being held in memory: the
+# first pass collects the distinct Link values, which are checked with one
+# query per linked doctype; the second validates every row against those
+# sets (plus mandatory, Select and date fields) and collects all errors; the
+# third inserts with multi-row INSERTs via frappe.db.bulk_insert. Document
+# hooks do not run for imported rows, so the sidecar tables (counters,
+# search index, SLA queue, fingerprints, similar-ticket indexes) are rebuilt
+# in the background afterwards.
+IMPORT_FORMATS = ("csv", "ndjson", "xlsx")
+IMPORT_FIELDS = [*TICKET_FIELDS_TO_MAP, "description", "resolution_date", "creation"]
+IMPORT_BATCH_SIZE = 5000
+MAX_REPORTED_ERRORS = 10000
+IMPORT_CACHE_KEY = "quantbit_helpdesk:ticket_import:"
+SIDECAR_REBUILDS = (
+    "quantbit_helpdesk.mobile_env.ticket_counters.rebuild_ticket_counters",
+    "quantbit_helpdesk.mobile_env.ticket_search.rebuild_search_index",
+    "quantbit_helpdesk.mobile_env.sla_risk.refresh_sla_risk_entries",
+    "quantbit_helpdesk.mobile_env.duplicates.rebuild_ticket_fingerprints",
+    "quantbit_helpdesk.mobile_env.similar_tickets.rebuild_similar_ticket_indexes",
+)
+
+
+def _file_format(path, file_format=None):
+    file_format = (file_format or os.path.splitext(path)[1].lstrip(".")).lower()
+    if file_format == "jsonl":
+        file_format = "ndjson"
+    if file_format not in IMPORT_FORMATS:
+        raise frappe.ValidationError(
+            f"Unsupported import format {file_format}, use one of: {', '.join(IMPORT_FORMATS)}"
+        )
+    return file_format
+
+
+def _raw_rows(path, file_format):
+    if file_format == "csv":
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            yield from csv.DictReader(f)
+    elif file_format == "ndjson":
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = [cstr(cell).strip() for cell in next(rows, ())]
+            for values in rows:
+                if any(value not in (None, "") for value in values):
+                    yield dict(zip(header, values, strict=True))
+        finally:
+            workbook.close()
+
+
+def read_rows(path, file_format):
+    """(row number, row) for every data row, limited to IMPORT_FIELDS, blanks as None."""
+    for row_number, row in enumerate(_raw_rows(path, file_format), 1):
+        cleaned = {}
+        for key, value in row.items():
+            key = cstr(key).strip()
+            if key in IMPORT_FIELDS:
+                if isinstance(value, str):
+                    value = value.strip()
+                cleaned[key] = None if value == "" else value
+        yield row_number, cleaned
+
+
+class _RowValidator:
+    def __init__(self, link_values):
+        meta = frappe.get_meta("HD Ticket")
+        self.link_fields = ticket_link_fields(IMPORT_FIELDS)
+        self.link_values = link_values
+        self.select_options = {
+            df.fieldname: set(cstr(df.options).split("\n"))
+            for df in meta.fields
+            if df.fieldtype == "Select" and df.fieldname in IMPORT_FIELDS
+        }
+        self.date_fields = [
+            df.fieldname
+            for df in meta.fields
+            if df.fieldtype in ("Date", "Datetime", "Time") and df.fieldname in IMPORT_FIELDS
+        ] + ["creation"]
+
+    def __call__(self, row):
+        errors = [f"{field}: value is required" for field in MANDATORY_TICKET_FIELDS if not row.get(field)]
+        for field, doctype in self.link_fields.items():
+            value = row.get(field)
+            if value and cstr(value) not in self.link_values.get(doctype, ()):
+                errors.append(f"{field}: {doctype} {value} does not exist")
+        for field, options in self.select_options.items():
+            value = row.get(field)
+            if value and value not in options:
+                errors.append(f"{field}: {value} is not one of {', '.join(o for o in options if o)}")
+        for field in self.date_fields:
+            if row.get(field):
+                try:
+                    get_datetime(row[field])
+                except Exception:
+                    errors.append(f"{field}: {row[field]} is not a valid date")
+        return errors
+
+
+def _collect_link_values(path, file_format):
+    link_fields = ticket_link_fields(IMPORT_FIELDS)
+    wanted = {}
+    for _, row in read_rows(path, file_format):
+        for field, doctype in link_fields.items():
+            if row.get(field):
+                wanted.setdefault(doctype, set()).add(row[field])
+    return existing_link_values(wanted)
+
+
+class _TicketWriter:
+    """Buffers valid rows and writes them with multi-row INSERTs."""
+
+    def __init__(self):
+        meta = frappe.get_meta("HD Ticket")
+        self.naming = meta.autoname or "hash"
+        self.defaults = {
+            df.fieldname: df.default
+            for df in meta.fields
+            if df.fieldname in IMPORT_FIELDS and df.default and df.default.lower() not in ("today", "now")
+        }
+        # TICKET_FIELDS_TO_MAP also lists fields that are not on every site's HD Ticket
+        self.data_fields = [f for f in IMPORT_FIELDS if f != "creation" and meta.has_field(f)]
+        self.columns = [
+            "name", "creation", "modified", "owner", "modified_by", "docstatus", "idx",
+            *self.data_fields, "custom_preview",
+        ]
+        self.timestamp, self.user = now(), frappe.session.user
+        self.buffer = []
+        self.inserted = 0
+
+    def next_name(self):
+        # autoincrement names come from the doctype sequence; the bigint
+        # primary key has no default to fall back on
+        if self.naming == "autoincrement":
+            return frappe.db.get_next_sequence_val("HD Ticket")
+        return make_autoname(self.naming, "HD Ticket")
+
+    def add(self, row):
+        row = {**self.defaults, **{k: v for k, v in row.items() if v is not None}}
+        creation = get_datetime(row.get("creation") or self.timestamp)
+        row.setdefault("opening_date", creation.date())
+        row.setdefault("opening_time", creation.time())
+        values = [
+            self.next_name(), creation, self.timestamp, self.user, self.user, 0, 0,
+            *(row.get(field) for field in self.data_fields),
+            html_to_text(row.get("description"), TICKET_PREVIEW_LENGTH),
+        ]
+        self.buffer.append(values)
+        if len(self.buffer) >= IMPORT_BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        frappe.db.bulk_insert("HD Ticket", self.columns, self.buffer, chunk_size=IMPORT_BATCH_SIZE)
+        frappe.db.commit()
+        self.inserted += len(self.buffer)
+        self.buffer = []
+
+
+def import_tickets(path, file_format=None, skip_invalid=False):
+    """
+    Import every row of `path`. Unless `skip_invalid`, nothing is inserted
+    when any row fails validation. Returns the counts and the errors as
+    [{"row": n, "errors": [...]}], row numbers counting data rows from 1.
+    """
+    file_format = _file_format(path, file_format)
+    validate = _RowValidator(_collect_link_values(path, file_format))
+
+    errors, error_count = [], 0
+    writer = _TicketWriter() if skip_invalid else None
+    for row_number, row in read_rows(path, file_format):
+        row_errors = validate(row)
+        if row_errors:
+            error_count += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({"row": row_number, "errors": row_errors})
+        elif writer:
+            writer.add(row)
+
+    if not writer:
+        if error_count:
+            return {"inserted": 0, "error_count": error_count, "errors": errors}
+        writer = _TicketWriter()
+        for _, row in read_rows(path, file_format):
+            writer.add(row)
+    writer.flush()
+
+    if writer.inserted:
+        for method in SIDECAR_REBUILDS:
+            frappe.enqueue(method, queue="long", timeout=4 * 60 * 60, job_id=method, deduplicate=True)
+    return {"inserted": writer.inserted, "error_count": error_count, "errors": errors}
+
+
+def run_ticket_import(import_id, file_url, file_format=None, skip_invalid=False):
+    """Background job behind start_ticket_import."""
+    cache_key = IMPORT_CACHE_KEY + import_id
+    frappe.cache().set_value(cache_key, {"status": "Running"}, expires_in_sec=24 * 60 * 60)
+    file_doc = frappe.get_doc("File", {"file_url": file_url})
+    try:
+        result = {"status": "Completed", **import_tickets(file_doc.get_full_path(), file_format, skip_invalid)}
+    except Exception as e:
+        frappe.db.rollback()
+        frappe.log_error(frappe.get_traceback(), "Error in ticket import")
+        result = {"status": "Failed", "message": str(e)}
+    frappe.cache().set_value(cache_key, result, expires_in_sec=24 * 60 * 60)
+
+
+@frappe.whitelist()
+def start_ticket_import(file_url, file_format=None, skip_invalid=0):
+    """Queue an import of an uploaded file; poll get_ticket_import_status with the returned id."""
+    frappe.has_permission("HD Ticket", "import", throw=True)
+    if not frappe.db.exists("File", {"file_url": file_url}):
+        return {"status": "error", "code": 404, "message": f"File {file_url} does not exist."}
+
+    import_id = frappe.generate_hash(length=12)
+    frappe.cache().set_value(IMPORT_CACHE_KEY + import_id, {"status": "Queued"}, expires_in_sec=24 * 60 * 60)
+    frappe.enqueue(
+        "quantbit_helpdesk.mobile_env.ticket_import.run_ticket_import",
+        queue="long",
+        timeout=6 * 60 * 60,
+        import_id=import_id,
+        file_url=file_url,
+        file_format=file_format,
+        skip_invalid=bool(cint(skip_invalid)),
+    )
+    return {"status": "success", "code": 200, "import_id": import_id}
+
+
+@frappe.whitelist()
+def get_ticket_import_status(import_id):
+    result = frappe.cache().get_value(IMPORT_CACHE_KEY + import_id)
+    if not result:
+        return {"status": "error", "code": 404, "message": f"Import {import_id} not found or expired."}
+    return {"status": "success", "code": 200, "data": result}
@@ -0,0 +1,235 @@
+import json
+
+import frappe
+from frappe.utils import cint, now
+
+from quantbit_helpdesk.mobile_env.app_utils import html_to_text
+
+# One `Ticket Search Entry` row per indexed document (the ticket itself and
+# each of its communications), carrying a copy of the ticket's facet columns.
+# `content` has a FULLTEXT index (see patches/add_ticket_search_fulltext_index)
+# and a ticket's score is the sum over its matching rows.
+FACET_FIELDS = [
+    "status", "priority", "agent_group", "custom_department",
+    "custom_sub_department", "custom_module", "custom_sub_module"
+]
+RESULT_FIELDS = [
+    "name", "subject", "status", "priority", "modified", "agent_group",
+    "custom_department", "custom_module", "custom_sub_module"
+]
+REBUILD_BATCH_SIZE = 1000
+
+
+def _entry_name(source_doctype, source_name):
+    return f"{source_doctype}-{source_name}"
+
+
+def _upsert_entry(ticket, source_doctype, source_name, content, facets):
+    values = {
+        "name": _entry_name(source_doctype, source_name),
+        "now": now(),
+        "user": frappe.session.user,
+        "ticket": ticket,
+        "source_doctype": source_doctype,
+        "source_name": source_name,
+        "content": content,
+        **{field: facets.get(field) for field in FACET_FIELDS},
+    }
+    facet_columns = ", ".join(f"`{field}`" for field in FACET_FIELDS)
+    facet_values = ", ".join(f"%({field})s" for field in FACET_FIELDS)
+    facet_updates = ", ".join(f"`{field}` = values(`{field}`)" for field in FACET_FIELDS)
+
+    frappe.db.sql(
+        f"""
+        insert into `tabTicket Search Entry`
+            (name, creation, modified, owner, modified_by, docstatus, idx,
+            ticket, source_doctype, source_name, content, {facet_columns})
+        values
+            (%(name)s, %(now)s, %(now)s, %(user)s, %(user)s, 0, 0,
+            %(ticket)s, %(source_doctype)s, %(source_name)s, %(content)s, {facet_values})
+        on duplicate key update
+            modified = values(modified), modified_by = values(modified_by),
+            ticket = values(ticket), content = values(content), {facet_updates}
+        """,
+        values,
+    )
+
+
+def _ticket_content(ticket):
+    return " ".join(filter(None, [ticket.get("subject"), html_to_text(ticket.get("description"))]))
+
+
+def _communication_content(communication):
+    return " ".join(
+        filter(None, [communication.get("subject"), html_to_text(communication.get("content"))])
+    )
+
+
+def index_ticket(doc, method=None):
+    """HD Ticket on_change: refresh the ticket row and, if needed, its facet copies."""
+    facets = {field: doc.get(field) for field in FACET_FIELDS}
+    _upsert_entry(doc.name, "HD Ticket", doc.name, _ticket_content(doc), facets)
+
+    before = doc.get_doc_before_save()
+    if before and any(before.get(field) != doc.get(field) for field in FACET_FIELDS):
+        assignments = ", ".join(f"`{field}` = %({field})s" for field in FACET_FIELDS)
+        frappe.db.sql(
+            f"""update `tabTicket Search Entry` set {assignments}
+            where ticket = %(ticket)s and source_doctype != 'HD Ticket'""",
+            {"ticket": doc.name, **facets},
+        )
+
+
+def remove_ticket(doc, method=None):
+    frappe.db.delete("Ticket Search Entry", {"ticket": doc.name})
+
+
+def index_communication(doc, method=None):
+    """Communication on_change: (re)index messages that belong to a ticket."""
+    if doc.reference_doctype != "HD Ticket" or not doc.reference_name:
+        remove_communication(doc)
+        return
+
+    facets = frappe.db.get_value("HD Ticket", doc.reference_name, FACET_FIELDS, as_dict=True)
+    if not facets:
+        return
+    _upsert_entry(
+        doc.reference_name, "Communication", doc.name, _communication_content(doc), facets
+    )
+
+
+def remove_communication(doc, method=None):
+    frappe.db.delete("Ticket Search Entry", {"name": _entry_name("Communication", doc.name)})
+
+
+def rebuild_search_index():
+    """Re-index every ticket and ticket communication in batches."""
+    last_name = None
+    while True:
+        filters = [["name", ">", last_name]] if last_name else []
+        tickets = frappe.get_all(
+            "HD Ticket",
+            filters=filters,
+            fields=["name", "subject", "description", *FACET_FIELDS],
+            order_by="name asc",
+            limit_page_length=REBUILD_BATCH_SIZE,
+        )
+        if not tickets:
+            break
+        for ticket in tickets:
+            _upsert_entry(ticket.name, "HD Ticket", ticket.name, _ticket_content(ticket), ticket)
+        frappe.db.commit()
+        last_name = tickets[-1].name
+
+    last_name = None
+    while True:
+        filters = [["reference_doctype", "=", "HD Ticket"]]
+        if last_name:
+            filters.append(["name", ">", last_name])
+        communications = frappe.get_all(
+            "Communication",
+            filters=filters,
+            fields=["name", "reference_name", "subject", "content"],
+            order_by="name asc",
+            limit_page_length=REBUILD_BATCH_SIZE,
+        )
+        if not communications:
+            break
+
+        facets = {
+            str(t.name): t
+            for t in frappe.get_all(
+                "HD Ticket",
+                filters={"name": ["in", list({c.reference_name for c in communications})]},
+                fields=["name", *FACET_FIELDS],
+            )
+        }
+        for communication in communications:
+            ticket = facets.get(communication.reference_name)
+            if ticket:
+                _upsert_entry(
+                    ticket.name, "Communication", communication.name,
+                    _communication_content(communication), ticket,
+                )
+        frappe.db.commit()
+        last_name = communications[-1].name
+
+
+@frappe.whitelist()
+def search_tickets(query, filters=None, facets=None, start=0, page_length=20):
+    """
+    Ranked full-text search over ticket subjects, descriptions and messages.
+
+    filters: JSON object of facet values, e.g. {"custom_module": "HR"}
+    facets: comma separated facet fields to count matches for
+    """
+    try:
+        if not query or not query.strip():
+            return {"status": "error", "code": 400, "message": "query is required."}
+
+        if isinstance(filters, str):
+            filters = json.loads(filters)
+        if isinstance(facets, str):
+            facets = [f.strip() for f in facets.split(",") if f.strip()]
+
+        values = {"query": query, "start": cint(start), "page_length": cint(page_length) or 20}
+        conditions = ["match(content) against (%(query)s)"]
+        for field, value in (filters or {}).items():
+            if field not in FACET_FIELDS:
+                return {"status": "error", "code": 400, "message": f"Cannot filter on {field}."}
+            conditions.append(f"`{field}` = %(filter_{field})s")
+            values[f"filter_{field}"] = value
+        where = " and ".join(conditions)
+
+        hits = frappe.db.sql(
+            f"""
+            select ticket, sum(match(content) against (%(query)s)) as score
+            from `tabTicket Search Entry`
+            where {where}
+            group by ticket
+            order by score desc
+            limit %(start)s, %(page_length)s
+            """,
+            values,
+            as_dict=True,
+        )
+
+        tickets = {}
+        if hits:
+            # HD Ticket names are integers, the sidecar stores them as text
+            tickets = {
+                str(t.name): t
+                for t in frappe.get_all(
+                    "HD Ticket",
+                    filters={"name": ["in", [hit.ticket for hit in hits]]},
+                    fields=RESULT_FIELDS,
+                )
+            }
+        results = []
+        for hit in hits:
+            ticket = tickets.get(str(hit.ticket))
+            if ticket:
+                ticket["score"] = hit.score
+                results.append(ticket)
+
+        facet_counts = {}
+        for field in facets or []:
+            if field not in FACET_FIELDS:
+                continue
+            facet_counts[field] = frappe.db.sql(
+                f"""
+                select `{field}` as value, count(distinct ticket) as count
+                from `tabTicket Search Entry`
+                where {where}
+                group by `{field}`
+                order by count desc
+                """,
+                values,
+                as_dict=True,
+            )
+
+        return {"status": "success", "code": 200, "data": results, "facets": facet_counts}
+
+    except Exception as e:
+        frappe.log_error(frappe.get_traceback(), "Error in search_tickets")
+        return {"status": "error", "code": 500, "message": str(e)}
@@ -18,7 +18,7 @@ from frappe.utils import (
     pretty_date,
     fmt_money,
 )
-from mobile.mobile_env.app_utils import (
+from quantbit_helpdesk.mobile_env.app_utils import (
     gen_response,
     generate_key,
     ess_validate,
@@ -31,6 +31,8 @@ from mobile.mobile_env.app_utils import (
 
 from erpnext.accounts.utils import get_fiscal_year
 
+from quantbit_helpdesk.mobile_env.http import fast_response
+
 import frappe
 import json
 from frappe import _
@@ -104,6 +106,7 @@ def exception_handler(e):
 
         
 @frappe.whitelist()
+@fast_response
 def get_timesheet_list(start=0, page_length=10, filters=None, month=None, year=None):
     try:
         # Initialize filters as a list if not provided
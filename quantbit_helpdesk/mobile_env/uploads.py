@@ -0,0 +1,158 @@
+import hashlib
+import io
+import os
+import shutil
+import time
+
+import frappe
+from frappe.utils import cint
+
+# Resumable uploads: chunks are written straight to a temp file under the
+# site's private folder, the upload's metadata lives in Redis. The client
+# asks get_upload_status for the received byte count after a dropped
+# connection and continues from there instead of from byte zero.
+UPLOAD_CACHE_KEY = "quantbit_helpdesk:chunked_upload:"
+UPLOAD_EXPIRY = 24 * 60 * 60
+UPLOAD_COPY_BUFFER = 1024 * 1024
+
+
+def _upload_dir():
+    path = frappe.get_site_path("private", "chunked_uploads")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _get_upload(upload_id):
+    upload = frappe.cache().get_value(UPLOAD_CACHE_KEY + upload_id)
+    if not upload or upload["owner"] != frappe.session.user:
+        raise frappe.DoesNotExistError(f"Upload {upload_id} not found or expired.")
+    return upload
+
+
+def _received(upload_id):
+    path = os.path.join(_upload_dir(), upload_id)
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+def _max_file_size():
+    return cint(frappe.conf.get("max_file_size")) or 25 * 1024 * 1024
+
+
+@frappe.whitelist()
+def start_upload(file_name, total_size, is_private=1):
+    """Open an upload and return its id. Chunks go to upload_chunk."""
+    total_size = cint(total_size)
+    if not file_name or total_size <= 0:
+        frappe.throw("file_name and a positive total_size are required.")
+    if total_size > _max_file_size():
+        frappe.throw(f"File is larger than the allowed {_max_file_size()} bytes.")
+
+    upload_id = frappe.generate_hash(length=20)
+    open(os.path.join(_upload_dir(), upload_id), "wb").close()
+    frappe.cache().set_value(
+        UPLOAD_CACHE_KEY + upload_id,
+        {
+            "owner": frappe.session.user,
+            "file_name": os.path.basename(file_name),
+            "total_size": total_size,
+            "is_private": cint(is_private),
+        },
+        expires_in_sec=UPLOAD_EXPIRY,
+    )
+    return {"upload_id": upload_id, "received": 0, "total_size": total_size}
+
+
+@frappe.whitelist()
+def get_upload_status(upload_id):
+    upload = _get_upload(upload_id)
+    return {"upload_id": upload_id, "received": _received(upload_id), "total_size": upload["total_size"]}
+
+
+@frappe.whitelist()
+def upload_chunk(upload_id, offset):
+    """
+    Write one chunk at `offset`, sent as the `chunk` multipart file or as the
+    raw request body. Offsets at or before the received size are accepted so
+    a retried chunk simply overwrites itself.
+    """
+    upload = _get_upload(upload_id)
+    offset = cint(offset)
+    received = _received(upload_id)
+    if offset < 0 or offset > received:
+        frappe.local.response["http_status_code"] = 409
+        return {"upload_id": upload_id, "received": received, "total_size": upload["total_size"]}
+
+    chunk = frappe.request.files.get("chunk")
+    # Frappe has already read the raw body while building form_dict, so the
+    # request stream is exhausted; get_data() returns the cached bytes
+    stream = chunk.stream if chunk else io.BytesIO(frappe.request.get_data())
+    path = os.path.join(_upload_dir(), upload_id)
+    with open(path, "r+b") as f:
+        f.seek(offset)
+        shutil.copyfileobj(stream, f, UPLOAD_COPY_BUFFER)
+        if f.tell() > upload["total_size"]:
+            f.truncate(upload["total_size"])
+            frappe.throw("Chunk goes past the declared total_size.")
+
+    return {"upload_id": upload_id, "received": _received(upload_id), "total_size": upload["total_size"]}
+
+
+@frappe.whitelist()
+def complete_upload(upload_id, sha256, attached_to_doctype=None, attached_to_name=None):
+    """Verify the SHA-256 of the assembled file and turn it into a File record."""
+    upload = _get_upload(upload_id)
+    path = os.path.join(_upload_dir(), upload_id)
+    if _received(upload_id) != upload["total_size"]:
+        frappe.throw(f"Upload incomplete: {_received(upload_id)} of {upload['total_size']} bytes received.")
+
+    if attached_to_doctype and attached_to_name:
+        frappe.has_permission(attached_to_doctype, "write", attached_to_name, throw=True)
+
+    sha, md5 = hashlib.sha256(), hashlib.md5(usedforsecurity=False)
+    with open(path, "rb") as f:
+        while block := f.read(UPLOAD_COPY_BUFFER):
+            sha.update(block)
+            md5.update(block)
+    if sha.hexdigest() != (sha256 or "").lower():
+        frappe.throw("Checksum mismatch, upload the file again.", frappe.ValidationError)
+
+    folder = "private" if upload["is_private"] else "public"
+    stem, ext = os.path.splitext(upload["file_name"])
+    file_name = upload["file_name"]
+    target = frappe.get_site_path(folder, "files", file_name)
+    if os.path.exists(target):
+        file_name = f"{stem}{frappe.generate_hash(length=6)}{ext}"
+        target = frappe.get_site_path(folder, "files", file_name)
+    # File validates the path on disk, so the move has to come first
+    shutil.move(path, target)
+
+    file_doc = frappe.get_doc(
+        {
+            "doctype": "File",
+            "file_name": file_name,
+            "file_url": f"/{'private/' if upload['is_private'] else ''}files/{file_name}",
+            "is_private": upload["is_private"],
+            "file_size": upload["total_size"],
+            # File would otherwise read the whole file back to hash it
+            "content_hash": md5.hexdigest(),
+            "attached_to_doctype": attached_to_doctype,
+            "attached_to_name": attached_to_name,
+        }
+    )
+    try:
+        file_doc.insert()
+    except Exception:
+        # keep the upload resumable instead of leaving an orphan without a File row
+        shutil.move(target, path)
+        raise
+    frappe.cache().delete_value(UPLOAD_CACHE_KEY + upload_id)
+    return file_doc
+
+
+def remove_stale_uploads():
+    """Daily: drop temp files of uploads that were never completed."""
+    cutoff = time.time() - UPLOAD_EXPIRY
+    directory = _upload_dir()
+    for entry in os.scandir(directory):
+        if entry.is_file() and entry.stat().st_mtime < cutoff:
+            os.remove(entry.path)
@@ -0,0 +1,83 @@
+import json
+import time
+from collections import OrderedDict
+
+import frappe
+
+USER_PROFILE_FIELDS = ["full_name", "user_image"]
+USER_PROFILE_CACHE_KEY = "quantbit_helpdesk:user_profile"
+
+# Small per-process LRU in front of the shared Redis hash. Entries expire
+# after a short TTL so edits made in another worker become visible even
+# though the on_update hook can only evict this process' copy. Keys include
+# the site because one worker serves every site of a bench.
+LOCAL_CACHE_SIZE = 2048
+LOCAL_CACHE_TTL = 60
+
+_local_cache = OrderedDict()
+
+
+def get_user_profiles(emails):
+    """
+    Resolve {email: {"full_name", "user_image"}} for a set of users.
+
+    Lookups go local LRU -> Redis -> one `name IN (...)` query for whatever
+    is still missing, so a whole page of rows costs at most one query.
+    Unknown users resolve to a profile with empty values.
+    """
+    emails = {email for email in emails if email}
+    profiles = {}
+    now = time.monotonic()
+
+    missing = []
+    site = frappe.local.site
+    for email in emails:
+        entry = _local_cache.get((site, email))
+        if entry and entry[0] > now:
+            _local_cache.move_to_end((site, email))
+            profiles[email] = entry[1]
+        else:
+            missing.append(email)
+
+    if not missing:
+        return profiles
+
+    cache = frappe.cache()
+    cache_key = cache.make_key(USER_PROFILE_CACHE_KEY)
+    for email, value in zip(missing, cache.hmget(cache_key, missing), strict=True):
+        if value is not None:
+            profiles[email] = json.loads(value)
+
+    to_query = [email for email in missing if email not in profiles]
+    if to_query:
+        fetched = {email: dict.fromkeys(USER_PROFILE_FIELDS) for email in to_query}
+        for row in frappe.get_all(
+            "User",
+            filters={"name": ["in", to_query]},
+            fields=["name", *USER_PROFILE_FIELDS],
+        ):
+            fetched[row.name] = {field: row.get(field) for field in USER_PROFILE_FIELDS}
+
+        cache.pipeline().hset(
+            cache_key, mapping={email: json.dumps(p) for email, p in fetched.items()}
+        ).execute()
+        profiles.update(fetched)
+
+    for email in missing:
+        _local_cache[(site, email)] = (now + LOCAL_CACHE_TTL, profiles[email])
+        _local_cache.move_to_end((site, email))
+    while len(_local_cache) > LOCAL_CACHE_SIZE:
+        _local_cache.popitem(last=False)
+
+    return profiles
+
+
+def get_user_profile(email):
+    return get_user_profiles([email]).get(email) or dict.fromkeys(USER_PROFILE_FIELDS)
+
+
+def clear_user_profile(doc, method=None, old=None, *args, **kwargs):
+    """User doc event: evict the cached profile (and the old name on rename)."""
+    for name in {doc.name, old} - {None}:
+        _local_cache.pop((frappe.local.site, name), None)
+        frappe.cache().hdel(USER_PROFILE_CACHE_KEY, name)
@@ -44,7 +44,7 @@ def create_visit(**kwargs):
             visit_doc.longitude=data.get('longitude')
             visit_doc.employee = emp_data.get("name")
             visit_doc.save(ignore_permissions=True)
-            return gen_response(200, "Visit updated Successfully")
+            return gen_response(200, "Visit updated Successfully", {"name": visit_doc.name})
         else:
             visit_doc = frappe.new_doc("Visit")
             frappe.msgprint(str(data.get("visit_type")))
@@ -57,7 +57,7 @@ def create_visit(**kwargs):
             visit_doc.location = data.get("location")
             visit_doc.employee = emp_data.get("name")
             visit_doc.insert()
-            return gen_response(200, "Visit created Successfully")
+            return gen_response(200, "Visit created Successfully", {"name": visit_doc.name})
     except Exception as e:
         return exception_handel(e)
 
@@ -0,0 +1,6 @@
+import frappe
+
+
+def execute():
+	# get_communications pages a ticket's thread by (creation, name)
+	frappe.db.add_index("Communication", ["reference_doctype", "reference_name", "creation", "name"])
@@ -0,0 +1,6 @@
+import frappe
+
+
+def execute():
+	# search_contacts is a prefix range scan ordered by (full_name, name)
+	frappe.db.add_index("Contact", ["full_name", "name"])
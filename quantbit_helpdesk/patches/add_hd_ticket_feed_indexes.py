@@ -0,0 +1,16 @@
+import frappe
+
+# get_hd_tickets orders by (modified, name) and optionally filters on status
+# and/or priority; each combination gets an index ending in the sort key so a
+# page is always a range scan from the cursor position
+TICKET_FEED_INDEXES = [
+	["modified", "name"],
+	["status", "modified", "name"],
+	["priority", "modified", "name"],
+	["status", "priority", "modified", "name"],
+]
+
+
+def execute():
+	for fields in TICKET_FEED_INDEXES:
+		frappe.db.add_index("HD Ticket", fields)
@@ -0,0 +1,10 @@
+import frappe
+
+from quantbit_helpdesk.mobile_env.sla_risk import rebuild_sla_risk_queue
+
+
+def execute():
+	# get_at_risk_tickets reads a deadline range inside a team/priority bucket
+	frappe.db.add_index("SLA Risk Entry", ["agent_group", "priority", "deadline"])
+	frappe.db.add_index("SLA Risk Entry", ["deadline"])
+	rebuild_sla_risk_queue()
@@ -0,0 +1,14 @@
+import frappe
+
+
+def execute():
+	if not frappe.db.has_index("tabTicket Search Entry", "content_fulltext"):
+		frappe.db.sql_ddl(
+			"alter table `tabTicket Search Entry` add fulltext index `content_fulltext` (`content`)"
+		)
+
+	frappe.enqueue(
+		"quantbit_helpdesk.mobile_env.ticket_search.rebuild_search_index",
+		queue="long",
+		timeout=4 * 60 * 60,
+	)
@@ -0,0 +1,34 @@
+import frappe
+from frappe.modules.utils import sync_customizations
+
+from quantbit_helpdesk.mobile_env.app_utils import html_to_text
+from quantbit_helpdesk.mobile_env.helpdesk import TICKET_PREVIEW_LENGTH
+
+
+def execute():
+	# customizations are otherwise only synced after post_model_sync patches
+	sync_customizations("quantbit_helpdesk")
+
+	last_name = None
+	while True:
+		filters = [["name", ">", last_name]] if last_name else []
+		tickets = frappe.get_all(
+			"HD Ticket",
+			filters=filters,
+			fields=["name", "description"],
+			order_by="name asc",
+			limit_page_length=1000,
+		)
+		if not tickets:
+			break
+
+		for ticket in tickets:
+			frappe.db.set_value(
+				"HD Ticket",
+				ticket.name,
+				"custom_preview",
+				html_to_text(ticket.description, TICKET_PREVIEW_LENGTH),
+				update_modified=False,
+			)
+		frappe.db.commit()
+		last_name = tickets[-1].name
@@ -0,0 +1,9 @@
+import frappe
+
+
+def execute():
+	frappe.enqueue(
+		"quantbit_helpdesk.mobile_env.duplicates.rebuild_ticket_fingerprints",
+		queue="long",
+		timeout=4 * 60 * 60,
+	)
@@ -0,0 +1,9 @@
+import frappe
+
+
+def execute():
+	frappe.enqueue(
+		"quantbit_helpdesk.mobile_env.similar_tickets.rebuild_similar_ticket_indexes",
+		queue="long",
+		timeout=4 * 60 * 60,
+	)
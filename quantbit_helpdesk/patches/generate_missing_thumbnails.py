@@ -0,0 +1,9 @@
+import frappe
+
+
+def execute():
+	frappe.enqueue(
+		"quantbit_helpdesk.mobile_env.thumbnails.generate_missing_thumbnails",
+		queue="long",
+		timeout=4 * 60 * 60,
+	)
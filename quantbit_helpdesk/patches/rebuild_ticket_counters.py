@@ -0,0 +1,5 @@
+from quantbit_helpdesk.mobile_env.ticket_counters import rebuild_ticket_counters
+
+
+def execute():
+	rebuild_ticket_counters()
@@ -0,0 +1,8 @@
+// Copyright (c) 2026, Quantbit Technology and contributors
+// For license information, please see license.txt
+
+// frappe.ui.form.on("Helpdesk Daily Rollup", {
+// 	refresh(frm) {
+
+// 	},
+// });